@@ -1,3 +1,3 @@
-from config.database import db
+from config.database import db, db_manager
 
-__all__ = ['db']
+__all__ = ['db', 'db_manager']
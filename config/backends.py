@@ -0,0 +1,399 @@
+import os
+import re
+import hashlib
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlparse, unquote
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'script.sql')
+
+_QUOTED_OR_PLACEHOLDER = re.compile(r"('(?:[^'\\]|\\.|'')*')|(%s|\?)")
+
+def translate_paramstyle(query: str, placeholder: str) -> str:
+    def replace(match):
+        return match.group(1) if match.group(1) else placeholder
+    return _QUOTED_OR_PLACEHOLDER.sub(replace, query)
+
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?: USING INDEX \w+)?$')
+
+class MySQLBackend:
+    name = 'mysql'
+    placeholder = '%s'
+    explain_prefix = 'EXPLAIN'
+    table_exists_query = ("SELECT 1 FROM information_schema.tables "
+                          "WHERE table_schema = DATABASE() AND table_name = %s")
+    column_exists_query = ("SELECT 1 FROM information_schema.columns "
+                           "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s")
+    index_exists_query = ("SELECT 1 FROM information_schema.statistics "
+                          "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1")
+
+    def __init__(self, host='localhost', user='root', password='', database='chaalak_db', port=3306):
+        import pymysql
+
+        self._pymysql = pymysql
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.port = port
+        self.recoverable_errors = (
+            pymysql.err.ProgrammingError,
+            pymysql.err.IntegrityError,
+            pymysql.err.DataError,
+            pymysql.err.NotSupportedError,
+        )
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            host=os.getenv('MYSQL_HOST', 'localhost'),
+            user=os.getenv('MYSQL_USER', 'root'),
+            password=os.getenv('MYSQL_PASSWORD', ''),
+            database=os.getenv('MYSQL_DATABASE', 'chaalak_db'),
+            port=int(os.getenv('MYSQL_PORT', 3306)),
+        )
+
+    @classmethod
+    def from_url(cls, url: str):
+        parsed = urlparse(url)
+        return cls(
+            host=parsed.hostname or 'localhost',
+            user=unquote(parsed.username or 'root'),
+            password=unquote(parsed.password or ''),
+            database=parsed.path.lstrip('/') or 'chaalak_db',
+            port=parsed.port or 3306,
+        )
+
+    def connect(self):
+        pymysql = self._pymysql
+        try:
+            return pymysql.connect(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                database=self.database,
+                port=self.port,
+                connect_timeout=5,
+                autocommit=True,
+                cursorclass=pymysql.cursors.DictCursor
+            )
+        except Exception as e:
+            import sys
+            print(f"DATABASE CONNECTION ERROR: {e}", file=sys.stderr, flush=True)
+            raise ConnectionError(f"Database connection failed: {e}")
+
+    def ping(self, conn):
+        conn.ping(reconnect=False)
+
+    def streaming_cursor(self, conn):
+        return conn.cursor(self._pymysql.cursors.SSDictCursor)
+
+    def accumulate_clause(self, key_columns, value_columns) -> str:
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in value_columns)
+        return f"ON DUPLICATE KEY UPDATE {updates}"
+
+    def create_table_statements(self, ddl: str):
+        return [ddl]
+
+    def drop_index_sql(self, table: str, name: str) -> str:
+        return f"DROP INDEX {name} ON {table}"
+
+    def full_scans(self, plan):
+        # On tiny tables the optimizer may pick ALL even when an index fits,
+        # so only a scan with no candidate index counts as a missing index.
+        # A full walk of a non-covering index is treated like a table scan.
+        return [
+            row.get('table') for row in plan
+            if (row.get('type') == 'ALL' and not row.get('possible_keys'))
+            or (row.get('type') == 'index' and 'Using index' not in (row.get('Extra') or ''))
+        ]
+
+class _SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, params=()):
+        self._cursor.execute(SQLiteBackend.translate(query), tuple(params or ()))
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(SQLiteBackend.translate(query), [tuple(p) for p in seq_of_params])
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+class _SQLiteConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, cursorclass=None):
+        return _SQLiteCursor(self._conn.cursor())
+
+    def begin(self):
+        self._conn.execute("BEGIN")
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def _sha2(value, bits):
+    if value is None:
+        return None
+    algorithm = {224: 'sha224', 256: 'sha256', 0: 'sha256', 384: 'sha384', 512: 'sha512'}.get(int(bits))
+    return hashlib.new(algorithm, str(value).encode('utf-8')).hexdigest() if algorithm else None
+
+def _uuid_to_bin(value):
+    if value is None:
+        return None
+    return value if isinstance(value, bytes) else uuid.UUID(str(value)).bytes
+
+def _bin_to_uuid(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) and len(value) == 16 else value
+
+def _parse_datetime(value: bytes):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+def _parse_date(value: bytes):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(bool, int)
+sqlite3.register_converter("TIMESTAMP", _parse_datetime)
+sqlite3.register_converter("DATETIME", _parse_datetime)
+sqlite3.register_converter("DATE", _parse_date)
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()))
+
+class SQLiteBackend:
+    name = 'sqlite'
+    placeholder = '?'
+    explain_prefix = 'EXPLAIN QUERY PLAN'
+    table_exists_query = "SELECT 1 FROM sqlite_master WHERE type='table' AND name=%s"
+    column_exists_query = "SELECT 1 FROM pragma_table_info(%s) WHERE name=%s"
+    index_exists_query = "SELECT 1 FROM sqlite_master WHERE type='index' AND tbl_name=%s AND name=%s"
+    recoverable_errors = (sqlite3.Error,)
+    _translations = {}
+
+    def __init__(self, path: str = 'chaalak.db', schema_path: str = SCHEMA_PATH):
+        if path in ('', ':memory:'):
+            self.target = f"file:chaalak_{id(self)}?mode=memory&cache=shared"
+            self.uri = True
+        else:
+            self.target = path
+            self.uri = False
+        self.path = path
+        self.schema_path = schema_path
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._anchor = None
+
+    @classmethod
+    def from_url(cls, url: str):
+        path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url[len('sqlite://'):]
+        return cls(path or ':memory:')
+
+    @classmethod
+    def translate(cls, query: str) -> str:
+        translated = cls._translations.get(query)
+        if translated is None:
+            translated = translate_paramstyle(query, '?')
+            if len(cls._translations) < 4096:
+                cls._translations[query] = translated
+        return translated
+
+    def connect(self):
+        if self.uri and self._anchor is None:
+            with self._schema_lock:
+                if self._anchor is None:
+                    # A shared in-memory database lives only while a connection
+                    # is open; the pool may discard or evict all of its own.
+                    self._anchor = sqlite3.connect(self.target, uri=True, check_same_thread=False)
+        try:
+            raw = sqlite3.connect(
+                self.target,
+                uri=self.uri,
+                timeout=5,
+                isolation_level=None,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+            )
+        except sqlite3.Error as e:
+            raise ConnectionError(f"Database connection failed: {e}")
+        raw.row_factory = _dict_row
+        raw.create_function('SHA2', 2, _sha2, deterministic=True)
+        raw.create_function('UUID_TO_BIN', 1, _uuid_to_bin, deterministic=True)
+        raw.create_function('BIN_TO_UUID', 1, _bin_to_uuid, deterministic=True)
+        raw.execute("PRAGMA foreign_keys=ON")
+        if not self.uri:
+            raw.execute("PRAGMA journal_mode=WAL")
+            raw.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema(raw)
+        return _SQLiteConnection(raw)
+
+    def ping(self, conn):
+        conn.ping()
+
+    def streaming_cursor(self, conn):
+        return conn.cursor()
+
+    def accumulate_clause(self, key_columns, value_columns) -> str:
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in value_columns)
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
+
+    def create_table_statements(self, ddl: str):
+        return mysql_schema_to_sqlite(ddl)
+
+    def drop_index_sql(self, table: str, name: str) -> str:
+        return f"DROP INDEX IF EXISTS {name}"
+
+    def full_scans(self, plan):
+        scans = (_SQLITE_FULL_SCAN.match(row.get('detail', '')) for row in plan)
+        return [match.group(1) for match in scans if match]
+
+    def _ensure_schema(self, raw):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            exists = raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='users'"
+            ).fetchone()
+            if not exists:
+                with open(self.schema_path, encoding='utf-8') as f:
+                    statements = mysql_schema_to_sqlite(f.read())
+                raw.execute("BEGIN")
+                try:
+                    for statement in statements:
+                        raw.execute(statement)
+                    raw.execute("COMMIT")
+                except Exception:
+                    raw.execute("ROLLBACK")
+                    raise
+            self._schema_ready = True
+
+_SKIPPED_STATEMENTS = re.compile(r'^(CREATE\s+DATABASE|USE|SHOW|DESCRIBE|SELECT)\b', re.IGNORECASE)
+_CREATE_TABLE = re.compile(r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)[^)]*$',
+                           re.IGNORECASE | re.DOTALL)
+_INDEX_DEFINITION = re.compile(r'^(UNIQUE\s+)?(?:INDEX|KEY)\s+`?(\w+)`?\s*\((.*)\)$', re.IGNORECASE | re.DOTALL)
+
+def _split_top_level(text: str, separator: str):
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == separator and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+def _sqlite_column(definition: str) -> str:
+    definition = re.sub(r'\bENUM\s*\([^)]*\)', 'TEXT', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\bJSON\b', 'TEXT', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\bBINARY\s*\(\s*\d+\s*\)', 'BLOB', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b', '', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\s+AUTO_INCREMENT\b', '', definition, flags=re.IGNORECASE)
+    return definition
+
+def split_statements(script: str):
+    lines = [line for line in script.splitlines() if not line.strip().startswith('--')]
+    return _split_top_level('\n'.join(lines), ';')
+
+def mysql_schema_to_sqlite(script: str):
+    statements = []
+    index_names = set()
+    for statement in split_statements(script):
+        if _SKIPPED_STATEMENTS.match(statement):
+            continue
+        match = _CREATE_TABLE.match(statement)
+        if not match:
+            statements.append(statement)
+            continue
+        table, body = match.groups()
+        columns, indexes = [], []
+        for item in _split_top_level(body, ','):
+            index = _INDEX_DEFINITION.match(item)
+            if index:
+                unique, name, index_columns = index.groups()
+                if name in index_names:
+                    name = f"{table}_{name}"
+                index_names.add(name)
+                indexes.append(
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({index_columns})"
+                )
+            else:
+                columns.append(_sqlite_column(item))
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(columns) + "\n)")
+        statements.extend(indexes)
+    return statements
+
+def backend_from_env():
+    url = os.getenv('DATABASE_URL', '').strip()
+    if not url:
+        return MySQLBackend.from_env()
+    scheme = url.split(':', 1)[0].lower()
+    if scheme == 'sqlite':
+        return SQLiteBackend.from_url(url)
+    if scheme in ('mysql', 'mysql+pymysql'):
+        return MySQLBackend.from_url(url)
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
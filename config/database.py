@@ -1,92 +1,389 @@
 import os
-import uuid
-import pymysql
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
 from dotenv import load_dotenv
 
+from config.backends import backend_from_env, translate_paramstyle
+from config.ids import decode_rows, encode_params, id_param, id_params, new_id, reference_id_range
+
+from config.metrics import QueryMetrics
+from config.pool import ConnectionPool
+from config.query_cache import QueryCache, table_tag, write_target
+from config.request_memo import RequestMemo, RequestMemoStats
+
 load_dotenv()
 
-class MySQLDB:
-    def __init__(self):
-        self.host = os.getenv('MYSQL_HOST', 'localhost')
-        self.user = os.getenv('MYSQL_USER', 'root')
-        self.password = os.getenv('MYSQL_PASSWORD', '')
-        self.database = os.getenv('MYSQL_DATABASE', 'chaalak_db')
-        self.port = int(os.getenv('MYSQL_PORT', 3306))
+MAX_PAGE_SIZE = 500
+MAX_FEED_PAGE_SIZE = 20
+MAX_SPEND_MONTHS = 36
+
+DRIVER_SUMMARY_COUNTS = (
+    'total_trips', 'completed_trips', 'pending_trips', 'active_trips',
+    'cancelled_trips', 'today_trips', 'total_ratings',
+)
+DRIVER_SUMMARY_AMOUNTS = (
+    'total_earnings', 'today_earnings', 'week_earnings', 'month_earnings', 'avg_rating',
+)
+
+BULK_INSERT_CHUNK_SIZE = 100
+BULK_UPDATE_CHUNK_SIZE = 500
+
+BOOKING_INSERT = """INSERT INTO bookings
+            (id, customer_id, driver_id, pickup_location, dropoff_location,
+             pickup_datetime, service_type, vehicle_type, status,
+             estimated_fare, actual_fare, special_instructions)
+            VALUES"""
+BOOKING_VALUES = "%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s"
+
+BOOKING_STATS_KEYS = ('day', 'status', 'service_type')
+BOOKING_STATS_VALUES = ('bookings', 'fare_total')
+BOOKING_STATS_ROLLUP = """INSERT INTO booking_stats_daily (day, status, service_type, bookings, fare_total)
+            SELECT DATE(created_at), status, service_type, {sign}COUNT(*), {sign}SUM(estimated_fare)
+            FROM bookings"""
+BOOKING_STATS_GROUP = "GROUP BY DATE(created_at), status, service_type"
+
+DRIVER_TALLY_SUBQUERY = "SELECT {aggregate} FROM bookings b WHERE b.driver_id = drivers.id{condition}"
+DRIVER_DEFAULT_RATING = 5.00
+DRIVER_RATING_REFRESH = ("rating = CASE WHEN rating_count > 0 THEN ROUND(1.0 * rating_sum / rating_count, 2) "
+                         f"ELSE {DRIVER_DEFAULT_RATING:.2f} END")
+
+CUSTOMER_LOCATION_COLUMNS = ('pickup_location', 'dropoff_location')
+
+BOOKING_SORTS = {
+    'newest': "created_at DESC, id DESC",
+    'oldest': "created_at ASC, id ASC",
+}
+
+# Admin grids sort only on indexed columns and push filters into the WHERE
+# clause; each filter is a (column, operator) pair where 'prefix' is a LIKE
+# match anchored at the start so it can still use an index.
+ADMIN_GRIDS = {
+    'users': {
+        'source': "users",
+        'columns': "id, username, email, phone, role, full_name, is_active, created_at",
+        'key': "id",
+        'sorts': {'created_at': "created_at", 'username': "username", 'email': "email"},
+        'filters': {
+            'role': ("role", '='),
+            'is_active': ("is_active", '='),
+            'username': ("username", 'prefix'),
+            'email': ("email", 'prefix'),
+        },
+    },
+    'drivers': {
+        'source': "drivers d JOIN users u ON d.user_id = u.id",
+        'columns': "d.*, u.username, u.email, u.phone, u.full_name",
+        'key': "d.id",
+        'sorts': {'created_at': "d.created_at", 'rating': "d.rating"},
+        'filters': {
+            'is_available': ("d.is_available", '='),
+            'username': ("u.username", 'prefix'),
+        },
+    },
+    'bookings': {
+        'source': "bookings",
+        'columns': "*",
+        'key': "id",
+        'sorts': {'created_at': "created_at", 'pickup_datetime': "pickup_datetime"},
+        'filters': {
+            'status': ("status", '='),
+            'service_type': ("service_type", '='),
+            'vehicle_type': ("vehicle_type", '='),
+            'created_from': ("created_at", '>='),
+        },
+    },
+}
+
+def customer_tag(customer_id: str):
+    return ('customer_bookings', customer_id)
+
+class Database:
+    def __init__(self, backend=None):
+        self.backend = backend or backend_from_env()
+        self._local = threading.local()
+        self.pool = ConnectionPool(
+            self.get_connection,
+            min_size=int(os.getenv('MYSQL_POOL_MIN_SIZE', 1)),
+            max_size=int(os.getenv('MYSQL_POOL_MAX_SIZE', 10)),
+            idle_timeout=float(os.getenv('MYSQL_POOL_IDLE_TIMEOUT', 300)),
+            wait_timeout=float(os.getenv('MYSQL_POOL_WAIT_TIMEOUT', 5)),
+            health_check=self.backend.ping,
+            recoverable_errors=self.backend.recoverable_errors,
+        )
+        self.metrics = QueryMetrics(
+            slow_query_seconds=float(os.getenv('MYSQL_SLOW_QUERY_MS', 500)) / 1000,
+            tag_queries=os.getenv('MYSQL_QUERY_TAGS', '1') != '0',
+        )
+        self.cache = QueryCache(
+            max_entries=int(os.getenv('QUERY_CACHE_SIZE', 1024)),
+            ttl=float(os.getenv('QUERY_CACHE_TTL', 60)),
+        )
+        self.request_stats = RequestMemoStats()
+        self._write_listeners = {}
 
     def get_connection(self):
+        return self.backend.connect()
+
+    @property
+    def in_transaction(self):
+        return getattr(self._local, 'conn', None) is not None
+
+    @contextmanager
+    def _connection(self):
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            yield pinned
+            return
+        with self.pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self):
+        if self.in_transaction:
+            yield self
+            return
+        with self.pool.connection() as conn:
+            self._local.conn = conn
+            self._local.pending_invalidations = []
+            callbacks = self._local.on_commit = []
+            try:
+                conn.begin()
+                try:
+                    yield self
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+            finally:
+                pending = self._local.pending_invalidations
+                self._local.conn = None
+                self._local.pending_invalidations = None
+                self._local.on_commit = None
+                for tags in pending:
+                    self._invalidate(tags)
+        for callback in callbacks:
+            callback()
+
+    def on_commit(self, callback):
+        callbacks = getattr(self._local, 'on_commit', None)
+        if callbacks is None:
+            callback()
+        else:
+            callbacks.append(callback)
+
+    def add_write_listener(self, listener):
+        # Keyed by qualified name so a reloaded module replaces its listener.
+        self._write_listeners[f"{listener.__module__}.{listener.__qualname__}"] = listener
+
+    def _notify_write(self, customers=(), drivers=(), driver_users=(), feed: bool = True, tables=()):
+        event = {
+            'customers': {c for c in customers if c},
+            'drivers': {d for d in drivers if d},
+            'driver_users': {u for u in driver_users if u},
+            'feed': feed,
+            'tables': {t for t in tables if t},
+        }
+
+        def notify():
+            for listener in list(self._write_listeners.values()):
+                listener(event)
+
+        if self._write_listeners:
+            self.on_commit(notify)
+
+    @contextmanager
+    def capture_queries(self):
+        captured = []
+        self._local.captured = captured
         try:
-            conn = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                port=self.port,
-                connect_timeout=5,
-                cursorclass=pymysql.cursors.DictCursor
-            )
-            return conn
-        except Exception as e:
-            import sys
-            print(f"DATABASE CONNECTION ERROR: {e}", file=sys.stderr, flush=True)
-            raise ConnectionError(f"Database connection failed: {e}")
+            yield captured
+        finally:
+            self._local.captured = None
+
+    @contextmanager
+    def request_scope(self, page: str):
+        if getattr(self._local, 'memo', None) is not None:
+            yield self._local.memo
+            return
+        memo = self._local.memo = RequestMemo(page)
+        try:
+            yield memo
+        finally:
+            self._local.memo = None
+            self.request_stats.record(memo)
+
+    def request_scope_stats(self):
+        return self.request_stats.snapshot()
+
+    def explain(self, query: str, params=tuple()):
+        return self.fetch_all(f"{self.backend.explain_prefix} {query}", params)
 
     def fetch_all(self, query: str, params=tuple()):
+        # Reads repeated within one page rerun are answered from the request
+        # memo; transactions always read through their pinned connection.
+        memo = getattr(self._local, 'memo', None)
+        if memo is not None and not self.in_transaction:
+            key = (query, tuple(params))
+            rows = memo.get(key)
+            if rows is not None:
+                return rows
+        captured = getattr(self._local, 'captured', None)
+        if captured is not None:
+            captured.append((query, tuple(params)))
         try:
-            conn = self.get_connection()
-            try:
-                cur = conn.cursor()
-                cur.execute(query, params)
-                return cur.fetchall()
-            finally:
-                try:
-                    cur.close()
-                except:
-                    pass
-                conn.close()
+            with self.metrics.track(query) as tracked:
+                with self._connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(tracked.sql, encode_params(params))
+                        rows = decode_rows(cur.fetchall())
+                        tracked.rows = len(rows)
         except Exception as e:
-            raise Exception(f"Database query failed: {e}")
+            raise Exception(f"Database query failed: {e}") from e
+        if memo is not None and not self.in_transaction:
+            memo.put(key, rows)
+        return rows
 
     def fetch_one(self, query: str, params=tuple()):
         rows = self.fetch_all(query, params)
         return rows[0] if rows else None
 
-    def execute(self, query: str, params=tuple()):
+    def stream_batches(self, query: str, params=tuple(), batch_size: int = 1000):
+        pinned = getattr(self._local, 'conn', None)
+        try:
+            conn = pinned or self.pool.acquire()
+        except Exception as e:
+            raise Exception(f"Database query failed: {e}") from e
+        caller = self.metrics.caller()
+        drained = False
+        failed = False
+        total_rows = 0
+        elapsed = 0.0
         try:
-            conn = self.get_connection()
+            cur = self.backend.streaming_cursor(conn)
             try:
-                cur = conn.cursor()
-                cur.execute(query, params)
-                conn.commit()
-                return cur.rowcount
+                started = time.perf_counter()
+                cur.execute(self.metrics.tag(query, caller), encode_params(params))
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    elapsed += time.perf_counter() - started
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    yield decode_rows(rows)
+                    started = time.perf_counter()
+                drained = True
+            except Exception as e:
+                failed = True
+                raise Exception(f"Database query failed: {e}") from e
             finally:
-                try:
+                if drained:
                     cur.close()
-                except:
-                    pass
-                conn.close()
+        finally:
+            # An unbuffered result that was abandoned half-way still has rows
+            # in flight on the socket, so the connection can't be reused.
+            if pinned is None:
+                self.pool.release(conn, discard=not drained)
+            self.metrics.observe(query, elapsed, total_rows, error=failed, caller=caller)
+
+    def stream(self, query: str, params=tuple(), batch_size: int = 1000):
+        for rows in self.stream_batches(query, params, batch_size):
+            yield from rows
+
+    def fetch_all_cached(self, query: str, params=tuple(), tags=()):
+        if not self.cache.enabled or self.in_transaction:
+            return self.fetch_all(query, params)
+        key = (query, tuple(params))
+        rows = self.cache.get(key)
+        if rows is None:
+            rows = tuple(self.fetch_all(query, params))
+            self.cache.put(key, rows, tags)
+        return [dict(row) for row in rows]
+
+    def fetch_one_cached(self, query: str, params=tuple(), tags=()):
+        rows = self.fetch_all_cached(query, params, tags)
+        return rows[0] if rows else None
+
+    def execute(self, query: str, params=tuple(), invalidate=None):
+        try:
+            with self.metrics.track(query) as tracked:
+                with self._connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(tracked.sql, encode_params(params))
+                        tracked.rows = cur.rowcount
+                        return cur.rowcount
         except Exception as e:
-            raise Exception(f"Database execution failed: {e}")
+            raise Exception(f"Database execution failed: {e}") from e
+        finally:
+            self._invalidate_after_write(query, invalidate)
+
+    def _invalidate_after_write(self, query: str, tags):
+        memo = getattr(self._local, 'memo', None)
+        if memo is not None:
+            memo.clear()
+        if tags is None:
+            table = write_target(query)
+            tags = (table_tag(table),) if table else None
+        self._invalidate(tags)
+
+    def _invalidate(self, tags):
+        pending = getattr(self._local, 'pending_invalidations', None)
+        if pending is not None:
+            pending.append(tags)
+        elif tags is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(*tags)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def metrics_snapshot(self):
+        snapshot = self.metrics.snapshot()
+        snapshot['pool'] = self.pool_stats()
+        snapshot['cache'] = self.cache_stats()
+        snapshot['request_scope'] = self.request_scope_stats()
+        return snapshot
+
+    def metrics_prometheus(self):
+        lines = [self.metrics.prometheus().rstrip("\n")]
+        for section, values in (('pool', self.pool_stats()), ('cache', self.cache_stats())):
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE chaalak_db_{section}_{key} gauge")
+                    lines.append(f"chaalak_db_{section}_{key} {value}")
+        lines.append("# TYPE chaalak_db_request_duplicates_avoided_total counter")
+        for page, stats in self.request_scope_stats().items():
+            lines.append(f'chaalak_db_request_duplicates_avoided_total{{page="{page}"}} {stats["duplicates_avoided"]}')
+        return "\n".join(lines) + "\n"
+
+    def pool_stats(self):
+        return self.pool.stats()
 
     def get_user_by_id(self, user_id: str):
-        return self.fetch_one(
+        return self.fetch_one_cached(
             "SELECT * FROM users WHERE id=%s AND is_active=1",
-            (user_id,)
+            (id_param(user_id),),
+            tags=(table_tag('users'), ('user', user_id))
         )
 
     def get_user_by_username(self, username: str):
-        return self.fetch_one(
+        return self.fetch_one_cached(
             "SELECT * FROM users WHERE username=%s AND is_active=1",
-            (username,)
+            (username,),
+            tags=(table_tag('users'), ('username', username))
         )
 
     def create_user(self, user_data: dict):
-        user_id = user_data.get('id') or str(uuid.uuid4())
+        user_id = user_data.get('id') or new_id()
         self.execute(
             """INSERT INTO users 
             (id, username, email, password_hash, phone, role, full_name, is_active)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
             (
-                user_id,
+                id_param(user_id),
                 user_data['username'],
                 user_data['email'],
                 user_data['password_hash'],
@@ -94,71 +391,440 @@ class MySQLDB:
                 user_data.get('role', 'customer'),
                 user_data.get('full_name'),
                 user_data.get('is_active', True)
-            )
+            ),
+            invalidate=(('user', user_id), ('username', user_data['username']))
         )
+        self._notify_write(feed=False)
         return user_id
 
     def get_driver_by_user_id(self, user_id: str):
-        return self.fetch_one("SELECT * FROM drivers WHERE user_id=%s", (user_id,))
+        return self.fetch_one_cached(
+            "SELECT * FROM drivers WHERE user_id=%s",
+            (id_param(user_id),),
+            tags=(table_tag('drivers'), ('driver_user', user_id))
+        )
 
     def create_driver(self, driver_data: dict):
-        driver_id = driver_data.get('id') or str(uuid.uuid4())
+        driver_id = driver_data.get('id') or new_id()
         self.execute(
             """INSERT INTO drivers 
             (id, user_id, license_number, license_expiry, experience_years, rating, is_available)
             VALUES (%s, %s, %s, %s, %s, %s, %s)""",
             (
-                driver_id,
-                driver_data['user_id'],
+                id_param(driver_id),
+                id_param(driver_data['user_id']),
                 driver_data['license_number'],
                 driver_data['license_expiry'],
                 driver_data.get('experience_years', 0),
                 driver_data.get('rating', 5.00),
                 driver_data.get('is_available', True)
-            )
+            ),
+            invalidate=(('driver_user', driver_data['user_id']),)
         )
+        self._notify_write(drivers=[driver_id], driver_users=[driver_data['user_id']], feed=False)
         return driver_id
 
-    def create_booking(self, booking_data: dict):
-        booking_id = booking_data.get('id') or str(uuid.uuid4())
-        self.execute(
-            """INSERT INTO bookings 
-            (id, customer_id, driver_id, pickup_location, dropoff_location, 
-             pickup_datetime, service_type, vehicle_type, status, 
-             estimated_fare, actual_fare, special_instructions)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (
-                booking_id,
-                booking_data['customer_id'],
-                booking_data.get('driver_id'),
-                booking_data['pickup_location'],
-                booking_data['dropoff_location'],
-                booking_data['pickup_datetime'],
-                booking_data['service_type'],
-                booking_data['vehicle_type'],
-                booking_data.get('status', 'pending'),
-                booking_data['estimated_fare'],
-                booking_data.get('actual_fare'),
-                booking_data.get('special_instructions', '')
+    def get_available_drivers(self):
+        return self.fetch_all("SELECT id, location FROM drivers WHERE is_available=1")
+
+    def set_driver_availability(self, driver_id: str, is_available: bool, location=None):
+        if location is not None:
+            updated = self.execute(
+                "UPDATE drivers SET is_available=%s, location=%s WHERE id=%s",
+                (bool(is_available), json.dumps(location), id_param(driver_id))
             )
+        else:
+            updated = self.execute(
+                "UPDATE drivers SET is_available=%s WHERE id=%s",
+                (bool(is_available), id_param(driver_id))
+            )
+        if not updated:
+            return updated
+        row = self.fetch_one("SELECT user_id, location FROM drivers WHERE id=%s", (id_param(driver_id),))
+        if location is None and row:
+            location = row['location']
+
+        def record():
+            from src.utils.surge import get_surge_tracker
+            get_surge_tracker().set_driver_available(driver_id, is_available, location)
+
+        self.on_commit(record)
+        self._notify_write(drivers=[driver_id], driver_users=[row['user_id']] if row else (), feed=False)
+        return updated
+
+    def _booking_row(self, booking_id: str, booking_data: dict):
+        return (
+            id_param(booking_id),
+            id_param(booking_data['customer_id']),
+            id_param(booking_data.get('driver_id')),
+            booking_data['pickup_location'],
+            booking_data['dropoff_location'],
+            booking_data['pickup_datetime'],
+            booking_data['service_type'],
+            booking_data['vehicle_type'],
+            booking_data.get('status', 'pending'),
+            booking_data['estimated_fare'],
+            booking_data.get('actual_fare'),
+            booking_data.get('special_instructions', '')
         )
+
+    def create_booking(self, booking_data: dict):
+        booking_id = booking_data.get('id') or new_id()
+        with self.transaction():
+            self.execute(
+                f"{BOOKING_INSERT} ({BOOKING_VALUES})",
+                self._booking_row(booking_id, booking_data),
+                invalidate=(('booking', booking_id), customer_tag(booking_data['customer_id']))
+            )
+            self._rollup_bookings([booking_id])
+            self._record_demand([booking_data])
+            self._notify_write(customers=[booking_data['customer_id']], drivers=[booking_data.get('driver_id')])
         return booking_id
 
+    def create_bookings_bulk(self, bookings: list, chunk_size: int = BULK_INSERT_CHUNK_SIZE):
+        rows = [self._booking_row(b.get('id') or new_id(), b) for b in bookings]
+        chunk_size = max(1, int(chunk_size))
+        with self.transaction():
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                self.execute(
+                    f"{BOOKING_INSERT} " + ", ".join([f"({BOOKING_VALUES})"] * len(chunk)),
+                    tuple(value for row in chunk for value in row),
+                    invalidate=tuple(('booking', row[0]) for row in chunk) +
+                    tuple({customer_tag(row[1]) for row in chunk})
+                )
+                self._rollup_bookings([row[0] for row in chunk])
+            self._record_demand(bookings)
+            self._notify_write(customers=[row[1] for row in rows], drivers=[row[2] for row in rows])
+        return [row[0] for row in rows]
+
+    def _record_demand(self, bookings: list):
+        pickups = [b['pickup_location'] for b in bookings if b.get('status', 'pending') == 'pending']
+
+        def record():
+            from src.utils.surge import get_surge_tracker
+            tracker = get_surge_tracker()
+            for pickup in pickups:
+                tracker.record_booking(pickup)
+
+        if pickups:
+            self.on_commit(record)
+
+    def _rollup_bookings(self, booking_ids: list, sign: int = 1):
+        placeholders = ', '.join(['%s'] * len(booking_ids))
+        clause = self.backend.accumulate_clause(BOOKING_STATS_KEYS, BOOKING_STATS_VALUES)
+        return self.execute(
+            f"""{BOOKING_STATS_ROLLUP.format(sign='-' if sign < 0 else '')}
+            WHERE id IN ({placeholders})
+            {BOOKING_STATS_GROUP}
+            {clause}""",
+            id_params(booking_ids)
+        )
+
+    def _booking_owners(self, booking_ids: list):
+        placeholders = ', '.join(['%s'] * len(booking_ids))
+        rows = self.fetch_all(
+            f"SELECT DISTINCT customer_id, driver_id FROM bookings WHERE id IN ({placeholders})",
+            id_params(booking_ids)
+        )
+        return {row['customer_id'] for row in rows}, {row['driver_id'] for row in rows}
+
+    def _booking_write_tags(self, booking_ids: list, customers):
+        return tuple(('booking', b) for b in booking_ids) + tuple(customer_tag(c) for c in customers)
+
+    def _transition_bookings(self, booking_ids: list, assignments: str, params=tuple(), driver_id: str = None):
+        placeholders = ', '.join(['%s'] * len(booking_ids))
+        with self.transaction():
+            customers, drivers = self._booking_owners(booking_ids)
+            self._rollup_bookings(booking_ids, sign=-1)
+            self._tally_drivers(booking_ids, sign=-1)
+            updated = self.execute(
+                f"UPDATE bookings SET {assignments} WHERE id IN ({placeholders})",
+                (*params, *id_params(booking_ids)),
+                invalidate=self._booking_write_tags(booking_ids, customers)
+            )
+            self._rollup_bookings(booking_ids)
+            self._tally_drivers(booking_ids)
+            # Reassignment moves ratings off the old driver, which is no
+            # longer on the booking, so refresh by the drivers captured above.
+            drivers = drivers | {driver_id}
+            self._refresh_driver_ratings(drivers)
+            self._notify_write(customers=customers, drivers=drivers)
+        return updated
+
+    def _tally_drivers(self, booking_ids: list, sign: int = 1):
+        placeholders = ', '.join(['%s'] * len(booking_ids))
+        scope = f" AND b.id IN ({placeholders})"
+        op = '-' if sign < 0 else '+'
+        ids = id_params(booking_ids)
+        return self.execute(
+            f"""UPDATE drivers SET
+            total_trips = total_trips {op} ({DRIVER_TALLY_SUBQUERY.format(
+                aggregate='COUNT(*)', condition=" AND b.status='completed'" + scope)}),
+            rating_sum = rating_sum {op} ({DRIVER_TALLY_SUBQUERY.format(
+                aggregate='COALESCE(SUM(b.rating), 0)', condition=scope)}),
+            rating_count = rating_count {op} ({DRIVER_TALLY_SUBQUERY.format(
+                aggregate='COUNT(b.rating)', condition=scope)})
+            WHERE id IN (SELECT driver_id FROM bookings WHERE id IN ({placeholders}))""",
+            ids * 4
+        )
+
+    def _refresh_driver_ratings(self, driver_ids):
+        driver_ids = [d for d in driver_ids if d]
+        if not driver_ids:
+            return 0
+        placeholders = ', '.join(['%s'] * len(driver_ids))
+        return self.execute(
+            f"UPDATE drivers SET {DRIVER_RATING_REFRESH} WHERE id IN ({placeholders})",
+            id_params(driver_ids)
+        )
+
+    def reconcile_driver_ratings(self):
+        with self.transaction():
+            updated = self.execute(
+                f"""UPDATE drivers SET
+                total_trips = ({DRIVER_TALLY_SUBQUERY.format(
+                    aggregate='COUNT(*)', condition=" AND b.status='completed'")}),
+                rating_sum = ({DRIVER_TALLY_SUBQUERY.format(
+                    aggregate='COALESCE(SUM(b.rating), 0)', condition='')}),
+                rating_count = ({DRIVER_TALLY_SUBQUERY.format(
+                    aggregate='COUNT(b.rating)', condition='')})"""
+            )
+            self.execute(f"UPDATE drivers SET {DRIVER_RATING_REFRESH}")
+        return updated
+
+    def rebuild_booking_stats(self):
+        with self.transaction():
+            self.execute("DELETE FROM booking_stats_daily")
+            return self.execute(f"{BOOKING_STATS_ROLLUP.format(sign='')} {BOOKING_STATS_GROUP}")
+
+    def get_booking_by_reference(self, reference: str):
+        low, high = reference_id_range(reference)
+        return self.fetch_one(
+            "SELECT * FROM bookings WHERE id BETWEEN %s AND %s ORDER BY id LIMIT 1",
+            id_params((low, high))
+        )
+
     def get_bookings_by_customer(self, customer_id: str):
         return self.fetch_all(
             "SELECT * FROM bookings WHERE customer_id=%s ORDER BY created_at DESC",
-            (customer_id,)
+            (id_param(customer_id),)
         )
 
     def get_bookings_by_driver(self, driver_id: str):
         return self.fetch_all(
             "SELECT * FROM bookings WHERE driver_id=%s ORDER BY created_at DESC",
-            (driver_id,)
+            (id_param(driver_id),)
         )
 
     def get_all_bookings(self):
         return self.fetch_all("SELECT * FROM bookings ORDER BY created_at DESC")
 
+    def stream_all_bookings(self, batch_size: int = 1000):
+        return self.stream_batches("SELECT * FROM bookings ORDER BY created_at DESC, id DESC", batch_size=batch_size)
+
+    def _bookings_page(self, where: str, params: tuple, cursor=None, page_size: int = 20):
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        conditions = [where] if where else []
+        params = list(params)
+        if cursor is not None:
+            created_at, booking_id = cursor
+            conditions.append("created_at <= %s AND (created_at < %s OR id < %s)")
+            params.extend([created_at, created_at, id_param(booking_id)])
+        where_sql = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.fetch_all(
+            f"SELECT * FROM bookings {where_sql}ORDER BY created_at DESC, id DESC LIMIT %s",
+            tuple(params) + (page_size + 1,)
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+        return {'rows': rows, 'next_cursor': next_cursor}
+
+    def get_bookings_by_customer_page(self, customer_id: str, cursor=None, page_size: int = 20):
+        return self._bookings_page("customer_id=%s", (id_param(customer_id),), cursor, page_size)
+
+    def get_bookings_by_driver_page(self, driver_id: str, cursor=None, page_size: int = 20):
+        return self._bookings_page("driver_id=%s", (id_param(driver_id),), cursor, page_size)
+
+    def get_all_bookings_page(self, cursor=None, page_size: int = 50):
+        return self._bookings_page("", (), cursor, page_size)
+
+    def _booking_filters(self, owner_column: str, owner_id: str, status=None, service_type=None,
+                         created_from=None, created_to=None):
+        conditions = [f"{owner_column}=%s"]
+        params = [id_param(owner_id)]
+        for column, value in (('status', status), ('service_type', service_type)):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                conditions.append(f"{column}=%s")
+                params.append(value)
+            elif value:
+                conditions.append(f"{column} IN ({', '.join(['%s'] * len(value))})")
+                params.extend(value)
+        if created_from is not None:
+            conditions.append("created_at >= %s")
+            params.append(created_from)
+        if created_to is not None:
+            conditions.append("created_at < %s")
+            params.append(created_to)
+        return ' AND '.join(conditions), tuple(params)
+
+    def get_admin_grid_page(self, grid: str, cursor=None, page_size: int = 50, sort: str = 'created_at',
+                            descending: bool = True, filters=None):
+        spec = ADMIN_GRIDS.get(grid)
+        if spec is None:
+            raise ValueError(f"Unsupported grid: {grid}")
+        if sort not in spec['sorts']:
+            raise ValueError(f"Unsupported sort: {sort}")
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        conditions, params = [], []
+        for name, value in (filters or {}).items():
+            if name not in spec['filters']:
+                raise ValueError(f"Unsupported filter: {name}")
+            if value is None or value == '':
+                continue
+            column, operator = spec['filters'][name]
+            if operator == 'prefix':
+                conditions.append(f"{column} LIKE %s")
+                params.append(f"{value}%")
+            else:
+                conditions.append(f"{column} {operator} %s")
+                params.append(value)
+        column, key = spec['sorts'][sort], spec['key']
+        direction, before = ('DESC', '<') if descending else ('ASC', '>')
+        if cursor is not None:
+            value, row_id = cursor
+            conditions.append(f"{column} {before}= %s AND ({column} {before} %s OR {key} {before} %s)")
+            params.extend([value, value, id_param(row_id)])
+        where_sql = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.fetch_all(
+            f"SELECT {spec['columns']} FROM {spec['source']} {where_sql}"
+            f"ORDER BY {column} {direction}, {key} {direction} LIMIT %s",
+            tuple(params) + (page_size + 1,)
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][sort], rows[-1]['id']) if has_more else None
+        return {'rows': rows, 'next_cursor': next_cursor}
+
+    def _search_bookings(self, owner_column: str, owner_id: str, status=None, service_type=None,
+                         created_from=None, created_to=None, sort: str = 'newest', limit: int = 100):
+        if sort not in BOOKING_SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        where, params = self._booking_filters(owner_column, owner_id, status, service_type,
+                                              created_from, created_to)
+        return self.fetch_all(
+            f"SELECT * FROM bookings WHERE {where} ORDER BY {BOOKING_SORTS[sort]} LIMIT %s",
+            params + (max(1, min(int(limit), MAX_PAGE_SIZE)),)
+        )
+
+    def search_customer_bookings(self, customer_id: str, status=None, service_type=None,
+                                 created_from=None, created_to=None, sort: str = 'newest',
+                                 limit: int = 100):
+        return self._search_bookings('customer_id', customer_id, status, service_type,
+                                     created_from, created_to, sort, limit)
+
+    def count_customer_bookings(self, customer_id: str, status=None, service_type=None,
+                                created_from=None, created_to=None):
+        where, params = self._booking_filters('customer_id', customer_id, status, service_type,
+                                              created_from, created_to)
+        row = self.fetch_one_cached(
+            f"SELECT COUNT(*) as total FROM bookings WHERE {where}",
+            params,
+            tags=(table_tag('bookings'), customer_tag(customer_id))
+        )
+        return row['total'] if row else 0
+
+    def get_customer_bookings_page(self, customer_id: str, page: int = 1, page_size: int = 10,
+                                   status=None, service_type=None, created_from=None,
+                                   created_to=None, sort: str = 'newest'):
+        if sort not in BOOKING_SORTS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        total = self.count_customer_bookings(customer_id, status, service_type, created_from, created_to)
+        pages = max(1, -(-total // page_size))
+        page = max(1, min(int(page), pages))
+        where, params = self._booking_filters('customer_id', customer_id, status, service_type,
+                                              created_from, created_to)
+        # Skipping earlier pages walks only the covering index; full rows
+        # are read for the visible page alone.
+        ids = [row['id'] for row in self.fetch_all(
+            f"SELECT id FROM bookings WHERE {where} ORDER BY {BOOKING_SORTS[sort]} LIMIT %s OFFSET %s",
+            params + (page_size, (page - 1) * page_size)
+        )]
+        rows = self.fetch_all(
+            f"SELECT * FROM bookings WHERE id IN ({', '.join(['%s'] * len(ids))}) ORDER BY {BOOKING_SORTS[sort]}",
+            id_params(ids)
+        ) if ids else []
+        return {'rows': rows, 'total': total, 'page': page, 'pages': pages, 'page_size': page_size}
+
+    def get_booking_details(self, booking_id: str):
+        return self.fetch_one(
+            """SELECT b.*, u.full_name as driver_name, u.phone as driver_phone, d.rating as driver_rating
+            FROM bookings b
+            LEFT JOIN drivers d ON b.driver_id = d.id
+            LEFT JOIN users u ON d.user_id = u.id
+            WHERE b.id=%s""",
+            (id_param(booking_id),)
+        )
+
+    def search_driver_bookings(self, driver_id: str, status=None, service_type=None,
+                               created_from=None, created_to=None, sort: str = 'newest',
+                               limit: int = 100):
+        return self._search_bookings('driver_id', driver_id, status, service_type,
+                                     created_from, created_to, sort, limit)
+
+    def get_customer_booking_facets(self, customer_id: str):
+        return self.fetch_all_cached(
+            """SELECT status, service_type, COUNT(*) as bookings,
+            SUM(COALESCE(actual_fare, estimated_fare)) as amount
+            FROM bookings WHERE customer_id=%s
+            GROUP BY status, service_type""",
+            (id_param(customer_id),),
+            tags=(table_tag('bookings'), customer_tag(customer_id))
+        )
+
+    def get_customer_monthly_spend(self, customer_id: str, months: int = 12):
+        months = max(1, min(int(months), MAX_SPEND_MONTHS))
+        today = date.today()
+        first = today.year * 12 + today.month - months
+        return self.fetch_all_cached(
+            """SELECT SUBSTR(created_at, 1, 7) as month, COUNT(*) as trips,
+            SUM(COALESCE(actual_fare, estimated_fare)) as amount
+            FROM bookings
+            WHERE customer_id=%s AND status='completed' AND created_at >= %s
+            GROUP BY SUBSTR(created_at, 1, 7)
+            ORDER BY month""",
+            (id_param(customer_id), date(first // 12, first % 12 + 1, 1)),
+            tags=(table_tag('bookings'), customer_tag(customer_id))
+        )
+
+    def get_customer_service_mix(self, customer_id: str):
+        return self.fetch_all_cached(
+            """SELECT service_type, COUNT(*) as trips,
+            SUM(CASE WHEN status='completed' THEN COALESCE(actual_fare, estimated_fare) ELSE 0 END) as amount
+            FROM bookings WHERE customer_id=%s
+            GROUP BY service_type
+            ORDER BY trips DESC, service_type""",
+            (id_param(customer_id),),
+            tags=(table_tag('bookings'), customer_tag(customer_id))
+        )
+
+    def get_customer_top_locations(self, customer_id: str, column: str = 'pickup_location', limit: int = 5):
+        if column not in CUSTOMER_LOCATION_COLUMNS:
+            raise ValueError(f"Unsupported location column: {column}")
+        return self.fetch_all_cached(
+            f"""SELECT {column} as location, COUNT(*) as trips
+            FROM bookings WHERE customer_id=%s
+            GROUP BY {column}
+            ORDER BY trips DESC, location
+            LIMIT %s""",
+            (id_param(customer_id), max(1, min(int(limit), MAX_PAGE_SIZE))),
+            tags=(table_tag('bookings'), customer_tag(customer_id))
+        )
+
     def get_all_users(self):
         return self.fetch_all("SELECT id, username, email, phone, role, full_name, is_active, created_at FROM users ORDER BY created_at DESC")
 
@@ -171,16 +837,38 @@ class MySQLDB:
         )
 
     def get_booking_stats(self):
-        return self.fetch_one(
+        return self.fetch_one_cached(
             """SELECT 
-            COUNT(*) as total_bookings,
-            SUM(CASE WHEN status='completed' THEN 1 ELSE 0 END) as completed,
-            SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) as pending,
-            SUM(CASE WHEN status='cancelled' THEN 1 ELSE 0 END) as cancelled,
-            SUM(CASE WHEN status='completed' THEN estimated_fare ELSE 0 END) as total_revenue
-            FROM bookings"""
+            SUM(bookings) as total_bookings,
+            SUM(CASE WHEN status='completed' THEN bookings ELSE 0 END) as completed,
+            SUM(CASE WHEN status='pending' THEN bookings ELSE 0 END) as pending,
+            SUM(CASE WHEN status='cancelled' THEN bookings ELSE 0 END) as cancelled,
+            SUM(CASE WHEN status='completed' THEN fare_total ELSE 0 END) as total_revenue
+            FROM booking_stats_daily""",
+            tags=(table_tag('booking_stats_daily'),)
         )
 
+    def get_revenue_series(self, days: int = 30):
+        return self.fetch_all_cached(
+            """SELECT day, SUM(bookings) as completed, SUM(fare_total) as revenue
+            FROM booking_stats_daily
+            WHERE status='completed' AND day >= %s
+            GROUP BY day
+            ORDER BY day""",
+            (date.today() - timedelta(days=max(1, int(days)) - 1),),
+            tags=(table_tag('booking_stats_daily'),)
+        )
+
+    def get_trip_request_feed(self, vehicle_types=None, cursor=None, page_size: int = 3):
+        if isinstance(vehicle_types, str):
+            vehicle_types = json.loads(vehicle_types) if vehicle_types.startswith('[') else [vehicle_types]
+        where = "status='pending' AND driver_id IS NULL"
+        params = ()
+        if vehicle_types:
+            where += f" AND vehicle_type IN ({', '.join(['%s'] * len(vehicle_types))})"
+            params = tuple(vehicle_types)
+        return self._bookings_page(where, params, cursor, min(int(page_size), MAX_FEED_PAGE_SIZE))
+
     def get_pending_unassigned_bookings(self):
         return self.fetch_all(
             """SELECT * FROM bookings 
@@ -190,40 +878,105 @@ class MySQLDB:
 
     def update_booking_status(self, booking_id: str, status: str, driver_id: str = None):
         if driver_id is None:
-            return self.execute(
-                "UPDATE bookings SET status=%s WHERE id=%s",
-                (status, booking_id)
-            )
-        return self.execute(
-            "UPDATE bookings SET status=%s, driver_id=%s WHERE id=%s",
-            (status, driver_id, booking_id)
-        )
+            return self._transition_bookings([booking_id], "status=%s", (status,))
+        return self._transition_bookings([booking_id], "status=%s, driver_id=%s", (status, id_param(driver_id)),
+                                         driver_id)
+
+    def update_booking_statuses_bulk(self, booking_ids: list, status: str, driver_id: str = None,
+                                     chunk_size: int = BULK_UPDATE_CHUNK_SIZE):
+        booking_ids = list(dict.fromkeys(booking_ids))
+        chunk_size = max(1, int(chunk_size))
+        updated = 0
+        with self.transaction():
+            for start in range(0, len(booking_ids), chunk_size):
+                chunk = booking_ids[start:start + chunk_size]
+                if driver_id is None:
+                    updated += self._transition_bookings(chunk, "status=%s", (status,))
+                else:
+                    updated += self._transition_bookings(chunk, "status=%s, driver_id=%s",
+                                                         (status, id_param(driver_id)), driver_id)
+        return updated
 
     def delete_booking(self, booking_id: str):
-        return self.execute(
-            "DELETE FROM bookings WHERE id=%s",
-            (booking_id,)
-        )
+        with self.transaction():
+            customers, drivers = self._booking_owners([booking_id])
+            self._rollup_bookings([booking_id], sign=-1)
+            self._tally_drivers([booking_id], sign=-1)
+            self._refresh_driver_ratings(drivers)
+            deleted = self.execute(
+                "DELETE FROM bookings WHERE id=%s",
+                (id_param(booking_id),),
+                invalidate=self._booking_write_tags([booking_id], customers)
+            )
+            self._notify_write(customers=customers, drivers=drivers)
+        return deleted
 
     def update_booking_rating(self, booking_id: str, rating: int, feedback: str = None):
-        return self.execute(
-            "UPDATE bookings SET rating=%s, feedback=%s WHERE id=%s",
-            (rating, feedback, booking_id)
-        )
+        with self.transaction():
+            customers, drivers = self._booking_owners([booking_id])
+            self._tally_drivers([booking_id], sign=-1)
+            updated = self.execute(
+                "UPDATE bookings SET rating=%s, feedback=%s WHERE id=%s",
+                (rating, feedback, id_param(booking_id)),
+                invalidate=self._booking_write_tags([booking_id], customers)
+            )
+            self._tally_drivers([booking_id])
+            self._refresh_driver_ratings(drivers)
+            self._notify_write(customers=customers, drivers=drivers, feed=False)
+        return updated
+
+    def get_driver_dashboard_summary(self, driver_id: str):
+        today = date.today()
+        tomorrow = today + timedelta(days=1)
+        week_start = today - timedelta(days=7)
+        month_start = today - timedelta(days=30)
+        row = self.fetch_one(
+            """SELECT
+            COUNT(*) as total_trips,
+            SUM(CASE WHEN status='completed' THEN 1 ELSE 0 END) as completed_trips,
+            SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) as pending_trips,
+            SUM(CASE WHEN status IN ('confirmed', 'in_progress') THEN 1 ELSE 0 END) as active_trips,
+            SUM(CASE WHEN status='cancelled' THEN 1 ELSE 0 END) as cancelled_trips,
+            SUM(CASE WHEN pickup_datetime >= %s AND pickup_datetime < %s THEN 1 ELSE 0 END) as today_trips,
+            SUM(CASE WHEN status='completed' THEN estimated_fare ELSE 0 END) as total_earnings,
+            SUM(CASE WHEN status='completed' AND pickup_datetime >= %s AND pickup_datetime < %s
+                THEN estimated_fare ELSE 0 END) as today_earnings,
+            SUM(CASE WHEN status='completed' AND pickup_datetime >= %s THEN estimated_fare ELSE 0 END) as week_earnings,
+            SUM(CASE WHEN status='completed' AND pickup_datetime >= %s THEN estimated_fare ELSE 0 END) as month_earnings
+            FROM bookings WHERE driver_id=%s""",
+            (today, tomorrow, today, tomorrow, week_start, month_start, id_param(driver_id))
+        ) or {}
+        row.update(self.get_driver_average_rating(driver_id))
+        summary = {key: int(row.get(key) or 0) for key in DRIVER_SUMMARY_COUNTS}
+        summary.update({key: float(row.get(key) or 0) for key in DRIVER_SUMMARY_AMOUNTS})
+        summary['avg_fare'] = (summary['total_earnings'] / summary['completed_trips']
+                               if summary['completed_trips'] else 0.0)
+        return summary
 
     def get_driver_average_rating(self, driver_id: str):
-        result = self.fetch_one(
-            "SELECT AVG(rating) as avg_rating, COUNT(rating) as total_ratings FROM bookings WHERE driver_id=%s AND rating IS NOT NULL",
-            (driver_id,)
+        result = self.fetch_one_cached(
+            """SELECT CASE WHEN rating_count > 0 THEN rating END as avg_rating, rating_count as total_ratings
+            FROM drivers WHERE id=%s""",
+            (id_param(driver_id),),
+            tags=(table_tag('drivers'),)
         )
         return result if result else {'avg_rating': 0, 'total_ratings': 0}
 
-    def cancel_booking(self, booking_id: str):
-        return self.execute(
-            "UPDATE bookings SET status='cancelled' WHERE id=%s",
-            (booking_id,)
+    def get_top_rated_drivers(self, limit: int = 10, min_ratings: int = 1):
+        return self.fetch_all_cached(
+            """SELECT d.id, u.full_name, d.rating, d.rating_count, d.total_trips
+            FROM drivers d
+            JOIN users u ON d.user_id = u.id
+            WHERE d.rating_count >= %s
+            ORDER BY d.rating DESC, d.rating_count DESC
+            LIMIT %s""",
+            (max(1, int(min_ratings)), max(1, min(int(limit), MAX_PAGE_SIZE))),
+            tags=(table_tag('drivers'), table_tag('users'))
         )
 
+    def cancel_booking(self, booking_id: str):
+        return self._transition_bookings([booking_id], "status='cancelled'")
+
     def read_table(self, table_name: str):
         if table_name != 'bookings':
             raise ValueError(f"Unsupported table_name: {table_name}")
@@ -232,4 +985,41 @@ class MySQLDB:
     def connect(self):
         return self.get_connection()
 
-db = MySQLDB()
+    def execute_insert(self, query: str, params=tuple()):
+        try:
+            with self.metrics.track(query) as tracked:
+                with self._connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(tracked.sql, encode_params(params))
+                        tracked.rows = cur.rowcount
+                        return cur.lastrowid
+        except Exception as e:
+            raise Exception(f"Database execution failed: {e}") from e
+        finally:
+            self._invalidate_after_write(query, None)
+
+MySQLDB = Database
+
+class QmarkAdapter:
+    def __init__(self, database):
+        self._db = database
+
+    def execute_query(self, query: str, params=tuple()):
+        return self._db.fetch_all(translate_paramstyle(query, '%s'), params)
+
+    # Raw writes don't say which rows they touch, so listeners only learn
+    # the table and must treat every entry cached from it as stale.
+    def execute_update(self, query: str, params=tuple()):
+        query = translate_paramstyle(query, '%s')
+        updated = self._db.execute(query, params)
+        self._db._notify_write(feed=False, tables=[write_target(query)])
+        return updated
+
+    def execute_insert(self, query: str, params=tuple()):
+        query = translate_paramstyle(query, '%s')
+        row_id = self._db.execute_insert(query, params)
+        self._db._notify_write(feed=False, tables=[write_target(query)])
+        return row_id
+
+db = Database()
+db_manager = QmarkAdapter(db)
@@ -0,0 +1,105 @@
+import re
+import secrets
+import threading
+import time
+import uuid
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+REFERENCE_PREFIX = "CK"
+
+_UUID_TEXT = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+_REFERENCE_ALIASES = str.maketrans({'I': '1', 'L': '1', 'O': '0'})
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def _next_timestamp():
+    global _last_ms, _counter
+    with _lock:
+        now = time.time_ns() // 1_000_000
+        if now > _last_ms:
+            _last_ms = now
+            # Start each millisecond low in the 12-bit counter so bursts
+            # stay inside the same millisecond instead of borrowing ahead.
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        return _last_ms, _counter
+
+def uuid7() -> uuid.UUID:
+    ms, counter = _next_timestamp()
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+def new_id() -> str:
+    return str(uuid7())
+
+def encode_id(value: str) -> bytes:
+    return uuid.UUID(value).bytes
+
+def decode_id(value: bytes) -> str:
+    return str(uuid.UUID(bytes=value))
+
+def is_uuid_text(value) -> bool:
+    return isinstance(value, str) and len(value) == 36 and _UUID_TEXT.match(value) is not None
+
+class IdParam(str):
+    # Marks a query parameter bound for a BINARY(16) id column. Only these
+    # are encoded, so free text that happens to look like a UUID is sent as is.
+    __slots__ = ()
+
+def id_param(value):
+    return IdParam(value) if isinstance(value, str) else value
+
+def id_params(values):
+    return tuple(id_param(value) for value in values)
+
+def _encode_param(value):
+    return encode_id(value) if value.__class__ is IdParam and is_uuid_text(value) else value
+
+def encode_params(params):
+    if isinstance(params, dict):
+        return {key: _encode_param(value) for key, value in params.items()}
+    return tuple(_encode_param(value) for value in params or ())
+
+def decode_row(row: dict) -> dict:
+    for key, value in row.items():
+        if value.__class__ is bytes and len(value) == 16:
+            row[key] = decode_id(value)
+    return row
+
+def decode_rows(rows):
+    for row in rows:
+        decode_row(row)
+    return rows
+
+def booking_reference(booking_id: str) -> str:
+    # The 48-bit timestamp and 12-bit counter are unique per process, so the
+    # reference stays short and maps back to a key range on bookings.id.
+    value = uuid.UUID(booking_id).int
+    prefix = ((value >> 80) << 12) | ((value >> 64) & 0xFFF)
+    chars = "".join(CROCKFORD[(prefix >> shift) & 0x1F] for shift in range(55, -1, -5))
+    return f"{REFERENCE_PREFIX}-{chars[:4]}-{chars[4:8]}-{chars[8:]}"
+
+def reference_id_range(reference: str):
+    text = reference.strip().upper()
+    if text.startswith(REFERENCE_PREFIX):
+        text = text[len(REFERENCE_PREFIX):]
+    text = text.replace('-', '').replace(' ', '').translate(_REFERENCE_ALIASES)
+    if len(text) != 12 or any(char not in CROCKFORD for char in text):
+        raise ValueError(f"Invalid booking reference: {reference}")
+    prefix = 0
+    for char in text:
+        prefix = (prefix << 5) | CROCKFORD.index(char)
+    high64 = ((prefix >> 12) << 16) | (0x7 << 12) | (prefix & 0xFFF)
+    low = uuid.UUID(int=high64 << 64)
+    high = uuid.UUID(int=(high64 << 64) | 0xFFFFFFFFFFFFFFFF)
+    return str(low), str(high)
@@ -0,0 +1,162 @@
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'IN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)', re.IGNORECASE)
+_VALUES_ROWS = re.compile(r'(\(\s*%s(?:\s*,\s*%s)*\s*\))(?:\s*,\s*\(\s*%s(?:\s*,\s*%s)*\s*\))+')
+_UNSAFE_TAG = re.compile(r'[^\w.-]')
+_SKIP_MODULES = ('config.', 'contextlib')
+
+def query_template(query: str) -> str:
+    template = _WHITESPACE.sub(' ', query).strip()
+    template = _IN_LIST.sub('IN (...)', template)
+    return _VALUES_ROWS.sub(r'\1, ...', template)
+
+class _QueryStats:
+    __slots__ = ('count', 'errors', 'slow', 'total_seconds', 'max_seconds', 'rows', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.slow = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+class _Tracked:
+    __slots__ = ('sql', 'rows')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.rows = 0
+
+class QueryMetrics:
+    def __init__(self, slow_query_seconds: float = 0.5, tag_queries: bool = True):
+        self.slow_query_seconds = slow_query_seconds
+        self.tag_queries = tag_queries
+        self._stats = {}
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def caller(self):
+        frame = sys._getframe(1)
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            if not module.startswith(_SKIP_MODULES):
+                page = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+                return page, frame.f_code.co_name
+            frame = frame.f_back
+        return 'unknown', 'unknown'
+
+    def tag(self, query: str, caller) -> str:
+        if not self.tag_queries:
+            return query
+        page, func = (_UNSAFE_TAG.sub('', part) for part in caller)
+        return f"/* page={page} func={func} */ {query}"
+
+    def template(self, query: str) -> str:
+        template = self._templates.get(query)
+        if template is None:
+            template = query_template(query)
+            if len(self._templates) < 4096:
+                self._templates[query] = template
+        return template
+
+    @contextmanager
+    def track(self, query: str):
+        caller = self.caller()
+        record = _Tracked(self.tag(query, caller))
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield record
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.observe(query, time.perf_counter() - started, record.rows, failed, caller)
+
+    def observe(self, query: str, seconds: float, rows: int = 0, error: bool = False, caller=None):
+        template = self.template(query)
+        slow = seconds >= self.slow_query_seconds > 0
+        with self._lock:
+            stats = self._stats.get(template)
+            if stats is None:
+                stats = self._stats[template] = _QueryStats()
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows or 0
+            if error:
+                stats.errors += 1
+            if slow:
+                stats.slow += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+            else:
+                stats.buckets[-1] += 1
+        if slow:
+            from src.utils.error_logger import log_warning
+            page, func = caller or ('unknown', 'unknown')
+            log_warning(f"Slow query ({seconds * 1000:.1f} ms, {rows or 0} rows) "
+                        f"from {page}.{func}: {template}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            queries = {}
+            for template, stats in self._stats.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), stats.buckets):
+                    cumulative += count
+                    buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+                queries[template] = {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'slow': stats.slow,
+                    'rows': stats.rows,
+                    'total_seconds': round(stats.total_seconds, 6),
+                    'avg_seconds': round(stats.total_seconds / stats.count, 6) if stats.count else 0.0,
+                    'max_seconds': round(stats.max_seconds, 6),
+                    'buckets': buckets,
+                }
+        return {'slow_query_seconds': self.slow_query_seconds, 'queries': queries}
+
+    def prometheus(self, prefix: str = 'chaalak_db') -> str:
+        snapshot = self.snapshot()['queries']
+        lines = [
+            f"# HELP {prefix}_query_duration_seconds Query latency by query template.",
+            f"# TYPE {prefix}_query_duration_seconds histogram",
+        ]
+        for template, stats in snapshot.items():
+            label = _label(template)
+            for bound, count in stats['buckets'].items():
+                lines.append(f'{prefix}_query_duration_seconds_bucket{{query="{label}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_query_duration_seconds_sum{{query="{label}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_query_duration_seconds_count{{query="{label}"}} {stats["count"]}')
+        for name, key, help_text in (
+            ('query_rows_total', 'rows', 'Rows returned or affected by query template.'),
+            ('query_errors_total', 'errors', 'Failed executions by query template.'),
+            ('slow_queries_total', 'slow', 'Executions over the slow-query threshold by query template.'),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for template, stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{query="{_label(template)}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
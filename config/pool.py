@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class PoolTimeoutError(ConnectionError):
+    pass
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+class ConnectionPool:
+    def __init__(self, factory, min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float = 300.0, wait_timeout: float = 5.0,
+                 ping_interval: float = 1.0, health_check=None, recoverable_errors: tuple = ()):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.ping_interval = ping_interval
+        self.health_check = health_check or (lambda conn: conn.ping(reconnect=False))
+        self.recoverable_errors = recoverable_errors
+
+        self._idle = deque()
+        self._in_use = {}
+        self._opening = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+
+        self._waiters = 0
+        self._borrows = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        try:
+            self.warm_up()
+        except Exception:
+            # Pre-opening is best effort: a database that is not reachable yet
+            # fails the first checkout instead of the import that builds the pool.
+            pass
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _open(self):
+        conn = self._factory()
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, entry):
+        if time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            self.health_check(entry.conn)
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        evicted = []
+        while len(self._idle) + len(self._in_use) + self._opening > self.min_size and self._idle:
+            oldest = self._idle[0]
+            if now - oldest.last_used < self.idle_timeout:
+                break
+            evicted.append(self._idle.popleft())
+        self._discarded += len(evicted)
+        return evicted
+
+    def acquire(self, timeout: float = None):
+        timeout = self.wait_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            entry = None
+            must_open = False
+            with self._cond:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+                evicted = self._evict_idle()
+                self._waiters += 1
+                try:
+                    while not self._idle and self._size() >= self.max_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"Timed out after {timeout:.1f}s waiting for a database connection "
+                                f"(pool max_size={self.max_size})"
+                            )
+                        self._cond.wait(remaining)
+                        if self._closed:
+                            raise ConnectionError("Connection pool is closed")
+                finally:
+                    self._waiters -= 1
+
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._in_use[id(entry.conn)] = entry
+                else:
+                    self._opening += 1
+                    must_open = True
+
+            for stale in evicted:
+                self._close_quietly(stale.conn)
+
+            if must_open:
+                try:
+                    entry = self._open()
+                finally:
+                    with self._cond:
+                        self._opening -= 1
+                        if entry is not None:
+                            self._in_use[id(entry.conn)] = entry
+                        else:
+                            self._cond.notify()
+            elif not self._healthy(entry):
+                self._discard(entry)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._borrows += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            return entry.conn
+
+    def release(self, conn, discard: bool = False):
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is None:
+                return
+            if not discard and not self._closed:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        self._discard(entry, tracked=False)
+
+    def _discard(self, entry, tracked: bool = True):
+        with self._cond:
+            if tracked:
+                self._in_use.pop(id(entry.conn), None)
+            self._discarded += 1
+            self._cond.notify()
+        self._close_quietly(entry.conn)
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            # Query-level errors leave the session usable; anything else (lost
+            # link, interface errors, interrupted reads) means the socket can't
+            # be trusted and must not go back into the pool.
+            broken = not isinstance(e, self.recoverable_errors) and \
+                not isinstance(e.__cause__, self.recoverable_errors)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def warm_up(self):
+        with self._cond:
+            missing = self.min_size - self._size()
+            self._opening += max(missing, 0)
+        opened = []
+        try:
+            for _ in range(max(missing, 0)):
+                opened.append(self._open())
+        finally:
+            with self._cond:
+                self._opening -= max(missing, 0)
+                now = time.monotonic()
+                for entry in opened:
+                    entry.last_used = now
+                    self._idle.append(entry)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'size': self._size(),
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiters': self._waiters,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'borrows': self._borrows,
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded,
+                'total_wait_seconds': round(self._total_wait, 6),
+                'avg_wait_seconds': round(self._total_wait / self._borrows, 6) if self._borrows else 0.0,
+                'max_wait_seconds': round(self._max_wait, 6),
+            }
+
@@ -0,0 +1,46 @@
+import threading
+
+class RequestMemo:
+    __slots__ = ('page', 'rows', 'queries', 'duplicates')
+
+    def __init__(self, page: str):
+        self.page = page
+        self.rows = {}
+        self.queries = 0
+        self.duplicates = 0
+
+    def get(self, key):
+        rows = self.rows.get(key)
+        if rows is None:
+            self.queries += 1
+            return None
+        self.duplicates += 1
+        return [dict(row) for row in rows]
+
+    def put(self, key, rows):
+        self.rows[key] = tuple(dict(row) for row in rows)
+
+    def clear(self):
+        self.rows.clear()
+
+class RequestMemoStats:
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def record(self, memo: RequestMemo):
+        with self._lock:
+            stats = self._pages.get(memo.page)
+            if stats is None:
+                stats = self._pages[memo.page] = {'reruns': 0, 'queries': 0, 'duplicates_avoided': 0}
+            stats['reruns'] += 1
+            stats['queries'] += memo.queries
+            stats['duplicates_avoided'] += memo.duplicates
+
+    def reset(self):
+        with self._lock:
+            self._pages.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {page: dict(stats) for page, stats in self._pages.items()}
@@ -11,9 +11,6 @@ class AppConfig:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///chaalak.db")
     PRIMARY_COLOR: str = "#667eea"
     SECONDARY_COLOR: str = "#764ba2"
-    STANDARD_RATE: int = 25
-    PREMIUM_RATE: int = 40
-    VIP_RATE: int = 65
     COMPANY_EMAIL: str = "contact@chaalak.com"
     COMPANY_PHONE: str = "1-800-CHAALAK"
     COMPANY_WEBSITE: str = "www.chaalak.com"
@@ -6,7 +6,7 @@ COLLATE utf8mb4_unicode_ci;
 USE chaalak_db;
 
 CREATE TABLE users (
-    id VARCHAR(36) PRIMARY KEY,
+    id BINARY(16) PRIMARY KEY,
     username VARCHAR(50) UNIQUE NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
@@ -17,19 +17,20 @@ CREATE TABLE users (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
-    INDEX idx_username (username),
-    INDEX idx_email (email),
-    INDEX idx_role (role)
+    INDEX idx_role_created (role, created_at),
+    INDEX idx_users_created (created_at)
 ) ENGINE=InnoDB;
 
 CREATE TABLE drivers (
-    id VARCHAR(36) PRIMARY KEY,
-    user_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    user_id BINARY(16) NOT NULL,
     license_number VARCHAR(50) UNIQUE NOT NULL,
     license_expiry DATE NOT NULL,
     experience_years INT DEFAULT 0,
     vehicle_types JSON,
     rating DECIMAL(3,2) DEFAULT 5.00,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
     total_trips INT DEFAULT 0,
     is_available BOOLEAN DEFAULT TRUE,
     background_verified BOOLEAN DEFAULT FALSE,
@@ -40,12 +41,14 @@ CREATE TABLE drivers (
     
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_id (user_id),
-    INDEX idx_license (license_number)
+    INDEX idx_rating (rating, rating_count, total_trips, user_id, id),
+    INDEX idx_drivers_created (created_at),
+    INDEX idx_available_created (is_available, created_at)
 ) ENGINE=InnoDB;
 
 CREATE TABLE vehicles (
-    id VARCHAR(36) PRIMARY KEY,
-    driver_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    driver_id BINARY(16) NOT NULL,
     make VARCHAR(50) NOT NULL,
     model VARCHAR(50) NOT NULL,
     year INT NOT NULL,
@@ -62,9 +65,9 @@ CREATE TABLE vehicles (
 ) ENGINE=InnoDB;
 
 CREATE TABLE bookings (
-    id VARCHAR(36) PRIMARY KEY,
-    customer_id VARCHAR(36) NOT NULL,
-    driver_id VARCHAR(36),
+    id BINARY(16) PRIMARY KEY,
+    customer_id BINARY(16) NOT NULL,
+    driver_id BINARY(16),
     pickup_location VARCHAR(255) NOT NULL,
     dropoff_location VARCHAR(255) NOT NULL,
     pickup_datetime DATETIME NOT NULL,
@@ -81,15 +84,21 @@ CREATE TABLE bookings (
     
     FOREIGN KEY (customer_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (driver_id) REFERENCES drivers(id) ON DELETE SET NULL,
-    INDEX idx_customer_id (customer_id),
-    INDEX idx_driver_id (driver_id),
-    INDEX idx_status (status),
+    INDEX idx_customer_created (customer_id, created_at, id),
+    INDEX idx_customer_status_service (customer_id, status, service_type, created_at),
+    INDEX idx_driver_created (driver_id, created_at, id),
+    INDEX idx_driver_status_pickup (driver_id, status, pickup_datetime),
+    INDEX idx_created (created_at, id),
+    INDEX idx_status_driver_created (status, driver_id, created_at, id),
+    INDEX idx_status_created (status, created_at, id),
+    INDEX idx_service_created (service_type, created_at, id),
+    INDEX idx_vehicle_created (vehicle_type, created_at, id),
     INDEX idx_pickup_datetime (pickup_datetime)
 ) ENGINE=InnoDB;
 
 CREATE TABLE payments (
-    id VARCHAR(36) PRIMARY KEY,
-    booking_id VARCHAR(36) NOT NULL,
+    id BINARY(16) PRIMARY KEY,
+    booking_id BINARY(16) NOT NULL,
     amount DECIMAL(10,2) NOT NULL,
     payment_method ENUM('cash', 'card', 'upi', 'netbanking') NOT NULL,
     payment_status ENUM('pending', 'completed', 'failed', 'refunded') DEFAULT 'pending',
@@ -102,23 +111,39 @@ CREATE TABLE payments (
     INDEX idx_status (payment_status)
 ) ENGINE=InnoDB;
 
+CREATE TABLE booking_stats_daily (
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    service_type VARCHAR(30) NOT NULL,
+    bookings INT NOT NULL DEFAULT 0,
+    fare_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (day, status, service_type),
+    INDEX idx_stats_status_day (status, day, bookings, fare_total)
+) ENGINE=InnoDB;
+
 -- Sample Users
 INSERT INTO users (id, username, email, password_hash, phone, role, full_name) VALUES 
-('550e8400-e29b-41d4-a716-446655440000', 'john_doe', 'john@example.com', SHA2('customer123', 256), '+1234567890', 'customer', 'John Doe'),
-('550e8400-e29b-41d4-a716-446655440001', 'driver_mike', 'mike@example.com', SHA2('driver123', 256), '+9876543210', 'driver', 'Mike Wilson'),
-('550e8400-e29b-41d4-a716-446655440002', 'admin_user', 'admin@chaalak.com', SHA2('admin123', 256), '+1122334455', 'admin', 'Admin User');
+(X'550e8400e29b41d4a716446655440000', 'john_doe', 'john@example.com', SHA2('customer123', 256), '+1234567890', 'customer', 'John Doe'),
+(X'550e8400e29b41d4a716446655440001', 'driver_mike', 'mike@example.com', SHA2('driver123', 256), '+9876543210', 'driver', 'Mike Wilson'),
+(X'550e8400e29b41d4a716446655440002', 'admin_user', 'admin@chaalak.com', SHA2('admin123', 256), '+1122334455', 'admin', 'Admin User');
 
 -- Sample Driver
 INSERT INTO drivers (id, user_id, license_number, license_expiry, experience_years, vehicle_types, documents, location) VALUES 
-('660e8400-e29b-41d4-a716-446655440000', '550e8400-e29b-41d4-a716-446655440001', 'DL123456789', '2026-12-31', 5, '["sedan", "suv"]', '{"license_verified": true}', '{"city": "Mumbai", "area": "Bandra"}');
+(X'660e8400e29b41d4a716446655440000', X'550e8400e29b41d4a716446655440001', 'DL123456789', '2026-12-31', 5, '["sedan", "suv"]', '{"license_verified": true}', '{"city": "Mumbai", "area": "Bandra"}');
 
 -- Sample Vehicle
 INSERT INTO vehicles (id, driver_id, make, model, year, license_plate, vehicle_type, color, insurance_expiry) VALUES 
-('770e8400-e29b-41d4-a716-446655440000', '660e8400-e29b-41d4-a716-446655440000', 'Honda', 'City', 2022, 'MH01AB1234', 'sedan', 'White', '2025-12-31');
+(X'770e8400e29b41d4a716446655440000', X'660e8400e29b41d4a716446655440000', 'Honda', 'City', 2022, 'MH01AB1234', 'sedan', 'White', '2025-12-31');
 
 -- Sample Booking
 INSERT INTO bookings (id, customer_id, pickup_location, dropoff_location, pickup_datetime, service_type, estimated_fare) VALUES 
-('880e8400-e29b-41d4-a716-446655440000', '550e8400-e29b-41d4-a716-446655440000', 'Mumbai Airport', 'Bandra West', '2025-10-15 10:00:00', 'airport_transfer', 450.00);
+(X'880e8400e29b41d4a716446655440000', X'550e8400e29b41d4a716446655440000', 'Mumbai Airport', 'Bandra West', '2025-10-15 10:00:00', 'airport_transfer', 450.00);
+
+-- Booking Stats Rollup
+INSERT INTO booking_stats_daily (day, status, service_type, bookings, fare_total)
+SELECT DATE(created_at), status, service_type, COUNT(*), SUM(estimated_fare)
+FROM bookings GROUP BY DATE(created_at), status, service_type;
 
 -- Check all tables were created
 SHOW TABLES;
@@ -1,180 +1,342 @@
 import os
-import uuid
+import re
+import sys
 import hashlib
 
-import pymysql
 from dotenv import load_dotenv
 
+from config.ids import id_param, new_id
+
 load_dotenv()
 
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_NAME = os.getenv("DB_NAME", "chaalak_db")
-DB_PORT = int(os.getenv("DB_PORT", "3306"))
 
 def hash_password(p: str) -> str:
     return hashlib.sha256(p.encode()).hexdigest()
 
-def connect_db():
-    return pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME,
-        port=DB_PORT,
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True,
-    )
-
-def create_tables():
-    conn = connect_db()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
+MIGRATIONS_TABLE = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
 
-            )
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
 
-            cur.execute(
+def _exists(db, query, params):
+    return db.fetch_one(query, params) is not None
 
-            )
+def create_missing_tables(db):
+    from config.backends import SCHEMA_PATH, split_statements
 
-            cur.execute(
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+    for statement in statements:
+        match = re.match(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?", statement, re.IGNORECASE)
+        if match and not _exists(db, db.backend.table_exists_query, (match.group(1),)):
+            for ddl in db.backend.create_table_statements(statement):
+                db.execute(ddl)
 
-            )
+def add_column(table, column, definition):
+    def apply(db):
+        if not _exists(db, db.backend.column_exists_query, (table, column)):
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return apply
 
-            cur.execute(
+def add_index(table, name, columns):
+    def apply(db):
+        if not _exists(db, db.backend.index_exists_query, (table, name)):
+            db.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+    return apply
 
-            )
+def drop_index(table, name):
+    def apply(db):
+        if _exists(db, db.backend.index_exists_query, (table, name)):
+            db.execute(db.backend.drop_index_sql(table, name))
+    return apply
 
-        print("✅ Tables created/verified in DB:", DB_NAME)
-    finally:
-        conn.close()
-
-def seed_data():
-
-    conn = connect_db()
-    try:
-        with conn.cursor() as cur:
-
-            cur.execute(
-                ,
-                (
-                    str(uuid.uuid4()),
-                    "admin",
-                    "admin@chaalak.com",
-                    hash_password("admin123"),
-                    "admin",
-                    "Admin User",
-                    "0000000000",
-                ),
-            )
+def call(method):
+    return lambda db: getattr(db, method)()
 
-            cur.execute(
-                ,
-                (
-                    str(uuid.uuid4()),
-                    "john_doe",
-                    "john@example.com",
-                    hash_password("customer123"),
-                    "customer",
-                    "John Doe",
-                    "1234567890",
-                ),
-            )
+UUID_COLUMNS = [
+    ("users", [("id", "NOT NULL")]),
+    ("drivers", [("id", "NOT NULL"), ("user_id", "NOT NULL")]),
+    ("vehicles", [("id", "NOT NULL"), ("driver_id", "NOT NULL")]),
+    ("bookings", [("id", "NOT NULL"), ("customer_id", "NOT NULL"), ("driver_id", "NULL")]),
+    ("payments", [("id", "NOT NULL"), ("booking_id", "NOT NULL")]),
+]
+
+UUID_FOREIGN_KEYS = [
+    ("drivers", "user_id", "users", "CASCADE"),
+    ("vehicles", "driver_id", "drivers", "CASCADE"),
+    ("bookings", "customer_id", "users", "CASCADE"),
+    ("bookings", "driver_id", "drivers", "SET NULL"),
+    ("payments", "booking_id", "bookings", "CASCADE"),
+]
 
-            cur.execute(
-                ,
-                (
-                    str(uuid.uuid4()),
-                    "driver_mike",
-                    "mike@example.com",
-                    hash_password("driver123"),
-                    "driver",
-                    "Mike Wilson",
-                    "9876543210",
-                ),
+def binary_uuid_keys(db):
+    if db.backend.name == "sqlite":
+        # SQLite keeps the declared column type; storing the 16-byte value is
+        # enough. Parent and child keys change together, so defer FK checks.
+        db.execute("PRAGMA defer_foreign_keys=ON")
+        for table, columns in UUID_COLUMNS:
+            assignments = ", ".join(
+                f"{c} = CASE WHEN typeof({c}) = 'text' THEN UUID_TO_BIN({c}) ELSE {c} END" for c, _ in columns
             )
+            db.execute(f"UPDATE {table} SET {assignments}")
+        return
 
-            cur.execute("SELECT id FROM users WHERE username=%s", ("john_doe",))
-            customer_id = cur.fetchone()["id"]
-
-            cur.execute("SELECT id FROM users WHERE username=%s", ("driver_mike",))
-            driver_user_id = cur.fetchone()["id"]
-
-            cur.execute(
-                ,
-                (
-                    str(uuid.uuid4()),
-                    driver_user_id,
-                    "DL123456789",
-                    "2026-12-31",
-                    5,
-                    5.00,
-                    True,
-                ),
+    pending = [
+        (table, columns) for table, columns in UUID_COLUMNS
+        if db.fetch_one(
+            """SELECT DATA_TYPE as data_type FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = 'id'""",
+            (table,),
+        )["data_type"].lower() != "binary"
+    ]
+    tables = [table for table, _ in UUID_COLUMNS]
+    placeholders = ", ".join(["%s"] * len(tables))
+    if pending:
+        for fk in db.fetch_all(
+            f"""SELECT TABLE_NAME as table_name, CONSTRAINT_NAME as name FROM information_schema.referential_constraints
+            WHERE constraint_schema = DATABASE() AND table_name IN ({placeholders})""",
+            tuple(tables),
+        ):
+            db.execute(f"ALTER TABLE {fk['table_name']} DROP FOREIGN KEY {fk['name']}")
+    for table, columns in pending:
+        # VARBINARY keeps the 36 text bytes so UUID_TO_BIN can rewrite them in
+        # place; the LENGTH guard skips rows converted by an interrupted run.
+        db.execute(f"ALTER TABLE {table} " + ", ".join(f"MODIFY {c} VARBINARY(36) {null}" for c, null in columns))
+        db.execute(f"UPDATE {table} SET " + ", ".join(
+            f"{c} = IF(LENGTH({c}) = 36, UUID_TO_BIN({c}), {c})" for c, _ in columns
+        ))
+        db.execute(f"ALTER TABLE {table} " + ", ".join(f"MODIFY {c} BINARY(16) {null}" for c, null in columns))
+    linked = {
+        (row["table_name"], row["column_name"]) for row in db.fetch_all(
+            f"""SELECT TABLE_NAME as table_name, COLUMN_NAME as column_name FROM information_schema.key_column_usage
+            WHERE table_schema = DATABASE() AND referenced_table_name IS NOT NULL AND table_name IN ({placeholders})""",
+            tuple(tables),
+        )
+    }
+    for table, column, parent, on_delete in UUID_FOREIGN_KEYS:
+        if (table, column) not in linked:
+            db.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column} "
+                f"FOREIGN KEY ({column}) REFERENCES {parent}(id) ON DELETE {on_delete}"
             )
 
-            cur.execute("SELECT id FROM drivers WHERE user_id=%s", (driver_user_id,))
-            driver_id = cur.fetchone()["id"]
+MIGRATIONS = [
+    (1, "create_missing_tables", [create_missing_tables]),
+    (2, "backfill_booking_stats_daily", [call("rebuild_booking_stats")]),
+    (3, "driver_rating_totals", [
+        add_column("drivers", "rating_sum", "INT NOT NULL DEFAULT 0"),
+        add_column("drivers", "rating_count", "INT NOT NULL DEFAULT 0"),
+        add_index("drivers", "idx_rating", "rating, rating_count, total_trips, user_id, id"),
+        call("reconcile_driver_ratings"),
+    ]),
+    (4, "booking_composite_indexes", [
+        add_index("bookings", "idx_customer_created", "customer_id, created_at, id"),
+        add_index("bookings", "idx_customer_status_service", "customer_id, status, service_type, created_at"),
+        add_index("bookings", "idx_driver_created", "driver_id, created_at, id"),
+        add_index("bookings", "idx_driver_status_pickup", "driver_id, status, pickup_datetime"),
+        add_index("bookings", "idx_created", "created_at, id"),
+        add_index("bookings", "idx_status_driver_created", "status, driver_id, created_at, id"),
+        drop_index("bookings", "idx_customer_id"),
+        drop_index("bookings", "idx_driver_id"),
+        drop_index("bookings", "idx_status"),
+    ]),
+    (5, "listing_and_rollup_indexes", [
+        add_index("users", "idx_users_created", "created_at"),
+        add_index("drivers", "idx_drivers_created", "created_at"),
+        add_index("booking_stats_daily", "idx_stats_status_day", "status, day, bookings, fare_total"),
+        drop_index("users", "idx_username"),
+        drop_index("users", "idx_email"),
+        drop_index("drivers", "idx_license"),
+    ]),
+    (6, "binary_uuid_keys", [binary_uuid_keys]),
+    (7, "admin_grid_indexes", [
+        add_index("bookings", "idx_status_created", "status, created_at, id"),
+        add_index("bookings", "idx_service_created", "service_type, created_at, id"),
+        add_index("bookings", "idx_vehicle_created", "vehicle_type, created_at, id"),
+        add_index("users", "idx_role_created", "role, created_at"),
+        add_index("drivers", "idx_available_created", "is_available, created_at"),
+        drop_index("users", "idx_role"),
+    ]),
+]
+
+# Dashboard read paths checked by --check-plans. Unbounded admin listings and
+# exports are left out: they read every row by design.
+QUERY_PLAN_CHECKS = [
+    ("get_user_by_id", (SAMPLE_ID,), {}),
+    ("get_user_by_username", ("plan_check",), {}),
+    ("get_driver_by_user_id", (SAMPLE_ID,), {}),
+    ("get_bookings_by_customer_page", (SAMPLE_ID,), {}),
+    ("get_bookings_by_customer_page", (SAMPLE_ID,), {"cursor": ("2025-01-01 00:00:00", SAMPLE_ID)}),
+    ("get_bookings_by_driver_page", (SAMPLE_ID,), {}),
+    ("get_all_bookings_page", (), {"cursor": ("2025-01-01 00:00:00", SAMPLE_ID)}),
+    ("get_admin_grid_page", ("bookings",), {"filters": {"status": "pending"}}),
+    ("get_admin_grid_page", ("bookings",), {"filters": {"service_type": "hourly"}, "cursor": ("2025-01-01 00:00:00", SAMPLE_ID)}),
+    ("get_admin_grid_page", ("bookings",), {"filters": {"vehicle_type": "suv"}}),
+    ("get_admin_grid_page", ("users",), {"filters": {"role": "driver"}}),
+    ("get_admin_grid_page", ("drivers",), {"filters": {"is_available": True}}),
+    ("search_customer_bookings", (SAMPLE_ID,), {"status": "completed", "service_type": "hourly"}),
+    ("search_customer_bookings", (SAMPLE_ID,), {"created_from": "2025-01-01", "sort": "oldest"}),
+    ("search_driver_bookings", (SAMPLE_ID,), {"status": "completed", "limit": 20}),
+    ("get_customer_bookings_page", (SAMPLE_ID,), {"page": 3, "status": "completed"}),
+    ("get_booking_details", (SAMPLE_ID,), {}),
+    ("get_customer_booking_facets", (SAMPLE_ID,), {}),
+    ("get_customer_monthly_spend", (SAMPLE_ID,), {}),
+    ("get_customer_service_mix", (SAMPLE_ID,), {}),
+    ("get_customer_top_locations", (SAMPLE_ID,), {}),
+    ("get_driver_dashboard_summary", (SAMPLE_ID,), {}),
+    ("get_driver_average_rating", (SAMPLE_ID,), {}),
+    ("get_top_rated_drivers", (), {}),
+    ("get_booking_stats", (), {}),
+    ("get_revenue_series", (), {}),
+    ("get_trip_request_feed", (["sedan", "suv"],), {}),
+    ("get_pending_unassigned_bookings", (), {}),
+]
+
+def applied_migrations(db):
+    db.execute(MIGRATIONS_TABLE)
+    return {row["version"] for row in db.fetch_all("SELECT version FROM schema_migrations")}
+
+def migrate(db=None):
+    """Apply pending MIGRATIONS in order, recording each in schema_migrations.
 
-            cur.execute(
-                ,
-                (customer_id, "Mumbai Airport", "Bandra"),
+    Each migration runs in db.transaction(), but MySQL commits DDL
+    implicitly, so a migration that fails half-way keeps the statements
+    that already ran and records no version row. Every step therefore
+    checks the schema before changing it (or rewrites data idempotently),
+    and re-running --migrate resumes where the failed run stopped.
+    """
+    if db is None:
+        from config.database import db
+    applied = applied_migrations(db)
+    pending = [m for m in MIGRATIONS if m[0] not in applied]
+    for version, name, steps in pending:
+        with db.transaction():
+            for step in steps:
+                step(db)
+            db.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
             )
-            existing = cur.fetchone()
-
-            if existing:
-                booking_id = existing["id"]
-            else:
-                booking_id = str(uuid.uuid4())
-                cur.execute(
-                    ,
-                    (
-                        booking_id,
-                        customer_id,
-                        driver_id,
-                        "Mumbai Airport",
-                        "Bandra",
-                        "2025-12-25 10:00:00",
-                        "airport_transfer",
-                        "sedan",
-                        "confirmed",
-                        800.00,
-                        "Please wait at Gate 2",
-                    ),
-                )
-
-            cur.execute(
-                "SELECT id FROM payments WHERE booking_id=%s LIMIT 1",
-                (booking_id,),
+        print(f"✅ Applied migration {version:03d} {name}")
+    if not pending:
+        print("✅ Schema is up to date.")
+    return [m[0] for m in pending]
+
+def check_query_plans(db=None):
+    if db is None:
+        from config.database import db
+    failures = []
+    with db.transaction():
+        for method, args, kwargs in QUERY_PLAN_CHECKS:
+            with db.capture_queries() as captured:
+                getattr(db, method)(*args, **kwargs)
+            for query, params in captured:
+                for table in db.backend.full_scans(db.explain(query, params)):
+                    failures.append((method, table, " ".join(query.split())))
+    return failures
+
+SEED_USERS = [
+    ("admin", "admin@chaalak.com", "admin123", "admin", "Admin User", "0000000000"),
+    ("john_doe", "john@example.com", "customer123", "customer", "John Doe", "1234567890"),
+    ("driver_mike", "mike@example.com", "driver123", "driver", "Mike Wilson", "9876543210"),
+]
+
+def seed_data(db=None):
+    if db is None:
+        from config.database import db
+    with db.transaction() as tx:
+        users = {}
+        for username, email, password, role, full_name, phone in SEED_USERS:
+            user = tx.fetch_one("SELECT id FROM users WHERE username=%s OR email=%s", (username, email))
+            users[username] = user["id"] if user else tx.create_user({
+                "username": username,
+                "email": email,
+                "password_hash": hash_password(password),
+                "role": role,
+                "full_name": full_name,
+                "phone": phone,
+            })
+
+        driver = tx.fetch_one("SELECT id FROM drivers WHERE user_id=%s", (id_param(users["driver_mike"]),))
+        driver_id = driver["id"] if driver else tx.create_driver({
+            "user_id": users["driver_mike"],
+            "license_number": "DL123456789",
+            "license_expiry": "2026-12-31",
+            "experience_years": 5,
+            "rating": 5.00,
+            "is_available": True,
+        })
+
+        booking = tx.fetch_one(
+            "SELECT id FROM bookings WHERE customer_id=%s AND pickup_location=%s AND dropoff_location=%s LIMIT 1",
+            (id_param(users["john_doe"]), "Mumbai Airport", "Bandra"),
+        )
+        booking_id = booking["id"] if booking else tx.create_booking({
+            "customer_id": users["john_doe"],
+            "driver_id": driver_id,
+            "pickup_location": "Mumbai Airport",
+            "dropoff_location": "Bandra",
+            "pickup_datetime": "2025-12-25 10:00:00",
+            "service_type": "airport_transfer",
+            "vehicle_type": "sedan",
+            "status": "confirmed",
+            "estimated_fare": 800.00,
+            "special_instructions": "Please wait at Gate 2",
+        })
+
+        if not tx.fetch_one("SELECT id FROM payments WHERE booking_id=%s LIMIT 1", (id_param(booking_id),)):
+            tx.execute(
+                """INSERT INTO payments
+                (id, booking_id, amount, payment_method, payment_status, transaction_id)
+                VALUES (%s, %s, %s, %s, %s, %s)""",
+                (id_param(new_id()), id_param(booking_id), 800.00, "upi", "completed", "DEMO-TXN-001"),
             )
-            pay_existing = cur.fetchone()
-            if not pay_existing:
-                cur.execute(
-                    ,
-                    (
-                        str(uuid.uuid4()),
-                        booking_id,
-                        800.00,
-                        "upi",
-                        "completed",
-                        "DEMO-TXN-001",
-                    ),
-                )
-
-        print("✅ Seed data inserted/verified.")
-        print("Demo accounts:")
-        print("  admin / admin123")
-        print("  john_doe / customer123")
-        print("  driver_mike / driver123")
-    finally:
-        conn.close()
+
+    print("✅ Seed data inserted/verified.")
+    print("Demo accounts:")
+    print("  admin / admin123")
+    print("  john_doe / customer123")
+    print("  driver_mike / driver123")
+
+def rebuild_booking_stats():
+    from config.database import db
+
+    rows = db.rebuild_booking_stats()
+    print(f"✅ Booking stats rollup rebuilt ({rows} rows).")
+
+def reconcile_driver_ratings():
+    from config.database import db
+
+    drivers = db.reconcile_driver_ratings()
+    print(f"✅ Driver ratings reconciled ({drivers} drivers).")
 
 def main():
+    if "--rebuild-stats" in sys.argv[1:]:
+        rebuild_booking_stats()
+        return
+    if "--reconcile-ratings" in sys.argv[1:]:
+        reconcile_driver_ratings()
+        return
+    if "--migrate" in sys.argv[1:]:
+        migrate()
+        return
+    if "--check-plans" in sys.argv[1:]:
+        failures = check_query_plans()
+        for method, table, query in failures:
+            print(f"❌ {method}: full scan of {table}: {query}")
+        if failures:
+            sys.exit(1)
+        print(f"✅ No full table scans in {len(QUERY_PLAN_CHECKS)} checked queries.")
+        return
     print(f"🚀 Using existing database: {DB_NAME}")
-    create_tables()
+    migrate()
     seed_data()
+    rebuild_booking_stats()
+    reconcile_driver_ratings()
     print("✅ Setup complete.")
 
 if __name__ == "__main__":
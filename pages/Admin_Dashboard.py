@@ -2,14 +2,22 @@ import streamlit as st
 import sys
 import os
 import pandas as pd
+from datetime import date
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.utils.custom_css import get_custom_css
 from config.database import db
+from src.utils.dataframes import csv_from_batches
+from src.utils import page_cache
+from src.components.admin_grid import render_admin_grid
 
 st.set_page_config(page_title="Chaalak - Admin", page_icon="🚗", layout="wide")
 st.markdown(get_custom_css(), unsafe_allow_html=True)
 
+ADMIN_SECTIONS = ["Users", "Drivers", "Bookings"]
+EXPORT_BATCH_SIZE = 5000
+REVENUE_SERIES_DAYS = 30
+
 def main():
     if not st.session_state.get('logged_in', False):
         st.error("Please login first")
@@ -33,7 +41,7 @@ def main():
     st.divider()
 
     try:
-        stats = db.get_booking_stats()
+        stats = page_cache.get_booking_stats()
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
             st.metric("Total Bookings", stats['total_bookings'] or 0)
@@ -45,48 +53,72 @@ def main():
             st.metric("Cancelled", stats['cancelled'] or 0)
         with col5:
             st.metric("Revenue", f"₹{stats['total_revenue'] or 0:.2f}")
+
+        series = page_cache.get_revenue_series(days=REVENUE_SERIES_DAYS)
+        if series:
+            st.subheader(f"Revenue (last {REVENUE_SERIES_DAYS} days)")
+            revenue = pd.DataFrame(series).set_index('day')['revenue'].astype(float)
+            st.line_chart(revenue)
     except:
         st.warning("Unable to load stats")
 
     st.divider()
 
-    tab1, tab2, tab3 = st.tabs(["Users", "Drivers", "Bookings"])
+    # Unlike st.tabs, which runs every tab's body on each rerun, only the
+    # selected section queries the database.
+    section = st.radio("Section", ADMIN_SECTIONS, horizontal=True, key="admin_section",
+                       label_visibility="collapsed")
 
-    with tab1:
+    if section == "Users":
         st.subheader("All Users")
         try:
-            users = db.get_all_users()
-            if users:
-                df = pd.DataFrame(users)
-                st.dataframe(df, use_container_width=True)
-            else:
-                st.info("No users found")
+            render_admin_grid('users')
         except Exception as e:
             st.error(f"Error loading users: {e}")
 
-    with tab2:
+    elif section == "Drivers":
         st.subheader("All Drivers")
         try:
-            drivers = db.get_all_drivers_with_users()
-            if drivers:
-                df = pd.DataFrame(drivers)
-                st.dataframe(df, use_container_width=True)
-            else:
-                st.info("No drivers found")
+            render_admin_grid('drivers')
         except Exception as e:
             st.error(f"Error loading drivers: {e}")
 
-    with tab3:
-        st.subheader("All Bookings")
+        st.subheader("Top Rated Drivers")
         try:
-            bookings = db.get_all_bookings()
-            if bookings:
-                df = pd.DataFrame(bookings)
-                st.dataframe(df, use_container_width=True)
+            leaders = page_cache.get_top_rated_drivers(limit=10)
+            if leaders:
+                st.dataframe(pd.DataFrame(leaders), use_container_width=True)
             else:
-                st.info("No bookings found")
+                st.info("No rated drivers yet")
+        except Exception as e:
+            st.error(f"Error loading ratings: {e}")
+
+    else:
+        st.subheader("All Bookings")
+        try:
+            render_admin_grid('bookings')
+            render_bookings_export()
         except Exception as e:
             st.error(f"Error loading bookings: {e}")
 
+    with st.expander("Query diagnostics"):
+        scopes = db.request_scope_stats()
+        if scopes:
+            st.caption("Duplicate reads answered from the per-rerun memo, by page")
+            st.dataframe(pd.DataFrame.from_dict(scopes, orient='index'), use_container_width=True)
+        else:
+            st.caption("No page reruns recorded yet")
+
+def render_bookings_export():
+    if st.button("Export All Bookings", key="admin_bookings_export"):
+        csv = csv_from_batches(db.stream_all_bookings(batch_size=EXPORT_BATCH_SIZE))
+        st.download_button(
+            label="Download CSV",
+            data=csv,
+            file_name=f"bookings_{date.today()}.csv",
+            mime="text/csv"
+        )
+
 if __name__ == "__main__":
-    main()
+    with db.request_scope("Admin_Dashboard"):
+        main()
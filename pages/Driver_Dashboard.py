@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 import os
+import json
 import pandas as pd
 from datetime import date, timedelta
 
@@ -8,10 +9,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from src.utils.custom_css import get_custom_css
 from src.utils.session_manager import is_logged_in, check_session_timeout
 from src.utils.error_logger import log_error, log_info
+from config.database import db
+from src.utils import page_cache
 
 st.set_page_config(page_title="Chaalak - Driver Dashboard", page_icon="🚗", layout="wide")
 st.markdown(get_custom_css(), unsafe_allow_html=True)
 
+RIDES_PAGE_SIZE = 10
+MAX_RIDES_PAGES = 10
+
 def main():
     if check_session_timeout():
         st.error("Session expired. Please login again")
@@ -45,63 +51,85 @@ def main():
     st.divider()
 
     try:
-        from config.database import db
-        driver_info = db.get_driver_by_user_id(user_id)
+        driver_info = page_cache.get_driver_by_user_id(user_id)
 
         if not driver_info:
             st.error("Driver profile not found")
             return
 
         driver_id = driver_info['id']
+        render_availability(driver_info, user_id)
+        summary = page_cache.get_driver_dashboard_summary(driver_id)
 
-        render_stats(driver_id)
+        render_stats(summary)
 
         st.divider()
 
         tab1, tab2, tab3 = st.tabs(["Available Rides", "My Trips", "Earnings"])
 
         with tab1:
-            render_available_rides(driver_id, user_id)
+            render_available_rides(driver_info, user_id)
 
         with tab2:
             render_my_trips(driver_id, user_id)
 
         with tab3:
-            render_earnings(driver_id)
+            render_earnings(driver_id, summary)
 
     except Exception as e:
         log_error("Driver Dashboard", str(e), user_id)
         st.error(f"Error loading dashboard: {e}")
 
-def render_stats(driver_id):
+def render_availability(driver_info, user_id):
+    location = driver_info.get('location')
+    if isinstance(location, (bytes, str)):
+        try:
+            location = json.loads(location)
+        except ValueError:
+            location = None
+    location = location if isinstance(location, dict) else {}
+    current_area = location.get('area', '')
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        available = st.toggle("Available for rides", value=bool(driver_info['is_available']))
+    with col2:
+        area = st.text_input("Current area", value=current_area, placeholder="e.g. Andheri West")
+
+    if available != bool(driver_info['is_available']) or area != current_area:
+        try:
+            # Only the area is edited here; other keys such as city are kept.
+            db.set_driver_availability(driver_info['id'], available,
+                                       {**location, 'area': area} if area != current_area else None)
+            log_info(f"Driver availability set to {available}", user_id)
+            st.success("Availability updated")
+        except Exception as e:
+            log_error("Driver Availability", str(e), user_id)
+            st.error("Could not update availability")
+
+def render_stats(summary):
     try:
-        from config.database import db
-        my_bookings = db.get_bookings_by_driver(driver_id)
-        rating_data = db.get_driver_average_rating(driver_id)
-
-        total_trips = len(my_bookings)
-        today_trips = sum(1 for b in my_bookings if b['pickup_datetime'].date() == date.today())
-        total_earnings = sum(b['estimated_fare'] for b in my_bookings if b['status'] == 'completed')
-        avg_rating = rating_data.get('avg_rating', 0) or 0
-
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Rating", f"{avg_rating:.1f} ⭐")
+            st.metric("Rating", f"{summary['avg_rating']:.1f} ⭐")
         with col2:
-            st.metric("Total Trips", total_trips)
+            st.metric("Total Trips", summary['total_trips'])
         with col3:
-            st.metric("Today's Trips", today_trips)
+            st.metric("Today's Trips", summary['today_trips'])
         with col4:
-            st.metric("Total Earnings", f"₹{total_earnings:.2f}")
+            st.metric("Total Earnings", f"₹{summary['total_earnings']:.2f}")
     except Exception as e:
         st.warning("Unable to load stats")
 
-def render_available_rides(driver_id, user_id):
+def render_available_rides(driver_info, user_id):
     st.subheader("Available Rides")
+    driver_id = driver_info['id']
 
     try:
-        from config.database import db
-        pending_bookings = db.get_pending_unassigned_bookings()
+        cursors = st.session_state.setdefault('available_rides_cursors', [None])
+        feed = page_cache.get_trip_request_feed(driver_info.get('vehicle_types'), cursor=cursors[-1],
+                                                page_size=RIDES_PAGE_SIZE)
+        pending_bookings = feed['rows']
 
         if pending_bookings:
             for booking in pending_bookings:
@@ -131,6 +159,17 @@ def render_available_rides(driver_id, user_id):
                     st.divider()
         else:
             st.info("No pending ride requests")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if len(cursors) > 1 and st.button("Newest requests", key="available_rides_reset"):
+                del cursors[1:]
+                st.rerun()
+        with col2:
+            if feed['next_cursor'] is not None and len(cursors) < MAX_RIDES_PAGES:
+                if st.button("More requests", key="available_rides_next"):
+                    cursors.append(feed['next_cursor'])
+                    st.rerun()
     except Exception as e:
         log_error("Available Rides", str(e), user_id)
         st.error(f"Error loading rides: {e}")
@@ -145,8 +184,7 @@ def render_my_trips(driver_id, user_id):
         date_filter = st.selectbox("Date Range", ["All Time", "Today", "This Week", "This Month"])
 
     try:
-        from config.database import db
-        my_bookings = db.get_bookings_by_driver(driver_id)
+        my_bookings = page_cache.get_bookings_by_driver(driver_id)
 
         if status_filter != "All":
             my_bookings = [b for b in my_bookings if b['status'] == status_filter.lower()]
@@ -192,18 +230,14 @@ def render_my_trips(driver_id, user_id):
         log_error("My Trips", str(e), user_id)
         st.error("Unable to load trips")
 
-def render_earnings(driver_id):
+def render_earnings(driver_id, summary):
     st.subheader("Earnings Dashboard")
 
     try:
-        from config.database import db
-        my_bookings = db.get_bookings_by_driver(driver_id)
-        completed = [b for b in my_bookings if b['status'] == 'completed']
-
-        today_earnings = sum(b['estimated_fare'] for b in completed if b['pickup_datetime'].date() == date.today())
-        week_earnings = sum(b['estimated_fare'] for b in completed if b['pickup_datetime'].date() >= date.today() - timedelta(days=7))
-        month_earnings = sum(b['estimated_fare'] for b in completed if b['pickup_datetime'].date() >= date.today() - timedelta(days=30))
-        total_earnings = sum(b['estimated_fare'] for b in completed)
+        today_earnings = summary['today_earnings']
+        week_earnings = summary['week_earnings']
+        month_earnings = summary['month_earnings']
+        total_earnings = summary['total_earnings']
 
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -217,6 +251,7 @@ def render_earnings(driver_id):
 
         st.divider()
 
+        completed = page_cache.search_driver_bookings(driver_id, status='completed', limit=20) if summary['completed_trips'] else []
         if completed:
             st.subheader("Recent Earnings")
             df = pd.DataFrame([{
@@ -224,7 +259,7 @@ def render_earnings(driver_id):
                 "Route": f"{b['pickup_location']} → {b['dropoff_location']}",
                 "Fare": f"₹{b['estimated_fare']}",
                 "Rating": '⭐' * b['rating'] if b.get('rating') else 'Not rated'
-            } for b in completed[:20]])
+            } for b in completed])
             st.dataframe(df, use_container_width=True)
 
             if st.button("Export Earnings Report"):
@@ -243,4 +278,5 @@ def render_earnings(driver_id):
         st.error("Unable to load earnings")
 
 if __name__ == "__main__":
-    main()
+    with db.request_scope("Driver_Dashboard"):
+        main()
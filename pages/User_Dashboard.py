@@ -7,8 +7,13 @@ from datetime import date, time, datetime, timedelta
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.utils.custom_css import get_custom_css
 from src.utils.session_manager import is_logged_in, check_session_timeout
-from src.utils.fare_calculator import calculate_fare, estimate_distance
+from src.utils.fare_calculator import calculate_fare, compare_vehicle_fares, estimate_distance
 from src.utils.error_logger import log_error, log_info
+from src.utils.helpers import generate_booking_reference
+from src.utils.surge import surge_multiplier
+from config.database import db
+from src.utils import page_cache
+from src.utils.dataframes import BookingFrame
 
 st.set_page_config(page_title="Chaalak - Dashboard", page_icon="🚗", layout="wide")
 st.markdown(get_custom_css(), unsafe_allow_html=True)
@@ -60,13 +65,13 @@ def main():
 def render_overview(user_id):
     st.header("Dashboard Overview")
     try:
-        from config.database import db
-        bookings = db.get_bookings_by_customer(user_id)
+        bookings = page_cache.get_bookings_by_customer(user_id)
 
-        total = len(bookings)
-        completed = sum(1 for b in bookings if b['status'] == 'completed')
-        pending = sum(1 for b in bookings if b['status'] in ['pending', 'confirmed'])
-        total_spent = sum(b['estimated_fare'] for b in bookings if b['status'] == 'completed')
+        frame = BookingFrame.from_rows(bookings)
+        total = len(frame)
+        completed = frame.count('completed')
+        pending = frame.count('pending', 'confirmed')
+        total_spent = frame.total_fare('completed')
 
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -119,11 +124,24 @@ def render_booking_form(user_id):
 
     if pickup and dropoff:
         distance = estimate_distance(pickup, dropoff)
-        fare_details = calculate_fare(distance, vehicle.lower(), service.lower().replace(' ', '_'))
+        surge = surge_multiplier(pickup)
+        fare_details = calculate_fare(distance, vehicle.lower(), service.lower().replace(' ', '_'), surge=surge)
 
         st.info(f"**Estimated Fare:** ₹{fare_details['total_fare']}")
+        if surge > 1:
+            st.warning(f"High demand near {pickup}: fares are {surge:g}× right now")
         with st.expander("Fare Breakdown"):
             st.write(fare_details['breakdown'])
+        with st.expander("Compare Vehicles"):
+            comparison = pd.DataFrame(compare_vehicle_fares(distance, service.lower().replace(' ', '_'), surge=surge))
+            comparison['vehicle_type'] = comparison['vehicle_type'].str.title()
+            st.dataframe(
+                comparison[['vehicle_type', 'base_fare', 'distance_fare', 'service_charge', 'total_fare']].rename(columns={
+                    'vehicle_type': 'Vehicle', 'base_fare': 'Base', 'distance_fare': 'Distance',
+                    'service_charge': 'Service', 'total_fare': 'Total (₹)'
+                }),
+                use_container_width=True, hide_index=True
+            )
 
     if st.button("Book Now", type="primary", use_container_width=True):
         if pickup and dropoff:
@@ -132,7 +150,8 @@ def render_booking_form(user_id):
                 from src.utils.notifications import notify_booking_confirmed
 
                 distance = estimate_distance(pickup, dropoff)
-                fare_details = calculate_fare(distance, vehicle.lower(), service.lower().replace(' ', '_'))
+                fare_details = calculate_fare(distance, vehicle.lower(), service.lower().replace(' ', '_'),
+                                              surge=surge_multiplier(pickup))
 
                 booking_data = {
                     'customer_id': user_id,
@@ -156,7 +175,7 @@ def render_booking_form(user_id):
                 except:
                     pass
 
-                st.success(f"Booking confirmed! ID: {booking_id[:8]}...")
+                st.success(f"Booking confirmed! Reference: {generate_booking_reference(booking_id)}")
                 st.balloons()
                 st.rerun()
             except Exception as e:
@@ -177,8 +196,7 @@ def render_my_bookings(user_id):
         date_to = st.date_input("To Date", value=date.today())
 
     try:
-        from config.database import db
-        bookings = db.get_bookings_by_customer(user_id)
+        bookings = page_cache.get_bookings_by_customer(user_id)
 
         if status_filter != "All":
             bookings = [b for b in bookings if b['status'] == status_filter.lower()]
@@ -270,4 +288,5 @@ def render_emergency():
     st.write("**Women Helpline:** 1091")
 
 if __name__ == "__main__":
-    main()
+    with db.request_scope("User_Dashboard"):
+        main()
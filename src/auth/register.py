@@ -98,16 +98,17 @@ def render_register_form():
                     'full_name': full_name
                 }
 
-                user_id = db.create_user(user_data)
-
-                if account_type == 'Driver':
-                    driver_data = {
-                        'user_id': user_id,
-                        'license_number': license_number,
-                        'license_expiry': license_expiry.isoformat(),
-                        'experience_years': experience_years
-                    }
-                    db.create_driver(driver_data)
+                with db.transaction() as tx:
+                    user_id = tx.create_user(user_data)
+
+                    if account_type == 'Driver':
+                        driver_data = {
+                            'user_id': user_id,
+                            'license_number': license_number,
+                            'license_expiry': license_expiry.isoformat(),
+                            'experience_years': experience_years
+                        }
+                        tx.create_driver(driver_data)
 
                 user_data['id'] = user_id
                 login_user(user_data)
@@ -1,6 +1,8 @@
-import uuid
 import streamlit as st
 from datetime import datetime, date, time
+from src.utils.fare_calculator import estimate_distance, quote
+from src.utils.helpers import generate_booking_reference
+from src.utils.surge import surge_multiplier
 from config.database import db
 
 def render_booking_form():
@@ -13,29 +15,7 @@ def render_booking_form():
         return
 
     def create_booking(booking_data: dict) -> str | None:
-        booking_id = str(uuid.uuid4())
-        now = datetime.now().isoformat(timespec="seconds")
-
-        rows = db.execute(
-            ,
-            (
-                booking_id,
-                booking_data["customer_id"],
-                booking_data.get("driver_id"),
-                booking_data["pickup_location"],
-                booking_data["dropoff_location"],
-                booking_data["pickup_datetime"],
-                booking_data["service_type"],
-                booking_data.get("vehicle_type", "sedan"),
-                booking_data.get("status", "pending"),
-                float(booking_data.get("estimated_fare", 0)),
-                booking_data.get("actual_fare"),
-                booking_data.get("special_instructions", ""),
-                now,
-                now,
-            ),
-        )
-        return booking_id if rows else None
+        return db.create_booking(booking_data)
 
     with st.form("booking_form"):
         col1, col2 = st.columns(2)
@@ -63,28 +43,20 @@ def render_booking_form():
             placeholder="Any special requirements...",
         )
 
-        fare_rates = {
-            "sedan": {"airport_transfer": 150, "corporate": 120, "wedding": 200, "hourly": 100, "outstation": 8},
-            "suv": {"airport_transfer": 200, "corporate": 160, "wedding": 250, "hourly": 130, "outstation": 10},
-            "luxury": {"airport_transfer": 300, "corporate": 250, "wedding": 400, "hourly": 200, "outstation": 15},
-            "hatchback": {"airport_transfer": 130, "corporate": 110, "wedding": 180, "hourly": 90, "outstation": 7},
-            "van": {"airport_transfer": 220, "corporate": 180, "wedding": 280, "hourly": 150, "outstation": 12},
-        }
-
-        base_rate = fare_rates.get(vehicle_type.lower(), fare_rates["sedan"]).get(service_type, 150)
-
         min_fare = 100
+        hours = 0
         if service_type == "hourly":
             hours = st.number_input("Hours needed", min_value=1, max_value=12, value=4)
-            default_est = max(int(base_rate * hours), min_fare)
-        else:
-            default_est = max(int(base_rate), min_fare)
+
+        distance = estimate_distance(pickup_location, dropoff_location) if pickup_location and dropoff_location else 0
+        fare = quote(distance, vehicle_type, service_type, hours, surge_multiplier(pickup_location))
+        default_est = max(int(fare.total_fare), min_fare)
 
         estimated_fare = st.number_input(
             "Estimated Fare",
             value=default_est,
             min_value=min_fare,
-            help=f"Base rate: {base_rate}",
+            help=f"Base fare: {fare.base_fare:g}",
         )
 
         submitted = st.form_submit_button("Book Ride", type="primary", use_container_width=True)
@@ -115,7 +87,7 @@ def render_booking_form():
             booking_id = create_booking(booking_data)
 
         if booking_id:
-            st.success(f"Ride booked successfully! Booking ID: {booking_id[:8]}...")
+            st.success(f"Ride booked successfully! Booking reference: {generate_booking_reference(booking_id)}")
             st.balloons()
 
             with st.expander("Booking Details", expanded=True):
@@ -1,8 +1,26 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from config.database import db
+from src.utils.helpers import generate_booking_reference
 
+BOOKING_PAGE_SIZE = 10
+
+STATUS_ICONS = {
+    'pending': '🟡',
+    'confirmed': '🔵',
+    'in_progress': '🟢',
+    'completed': '✅',
+    'cancelled': '❌'
+}
+
+DATE_RANGES = {
+    'Last 7 Days': 7,
+    'Last 30 Days': 30,
+    'Last 3 Months': 90,
+}
+
+@db.request_scope("booking_history")
 def render_booking_history():
 
     st.subheader("📊 Your Booking History")
@@ -13,58 +31,55 @@ def render_booking_history():
 
     try:
 
-        bookings = db.get_bookings_by_customer(st.session_state.user_id)
+        facets = db.get_customer_booking_facets(st.session_state.user_id)
 
-        if not bookings:
+        if not facets:
             st.info("📭 No bookings yet! Book your first ride to see it here.")
             if st.button("🚗 Book a Ride"):
                 st.switch_page("pages/👤_User_Dashboard.py")
             return
 
-        render_booking_stats(bookings)
+        render_booking_stats(facets)
 
-        render_booking_filters(bookings)
+        render_booking_filters(facets)
 
     except Exception as e:
         st.error(f"❌ Error loading booking history: {str(e)}")
         print(f"Booking history error: {e}")
 
-def render_booking_stats(bookings):
+def render_booking_stats(facets):
 
-    total_bookings = len(bookings)
-    completed_bookings = [b for b in bookings if b['status'] == 'completed']
-    pending_bookings = [b for b in bookings if b['status'] == 'pending']
-    cancelled_bookings = [b for b in bookings if b['status'] == 'cancelled']
+    def count(status=None):
+        return sum(f['bookings'] for f in facets if status is None or f['status'] == status)
 
-    total_spent = sum(float(b.get('actual_fare', b.get('estimated_fare', 0)))
-                     for b in completed_bookings)
+    total_spent = sum(float(f['amount'] or 0) for f in facets if f['status'] == 'completed')
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("📋 Total Bookings", total_bookings)
+        st.metric("📋 Total Bookings", count())
 
     with col2:
-        st.metric("✅ Completed", len(completed_bookings))
+        st.metric("✅ Completed", count('completed'))
 
     with col3:
-        st.metric("⏳ Pending", len(pending_bookings))
+        st.metric("⏳ Pending", count('pending'))
 
     with col4:
         st.metric("💰 Total Spent", f"₹{total_spent:,.0f}")
 
     st.divider()
 
-def render_booking_filters(bookings):
+def render_booking_filters(facets):
 
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        status_options = ['All'] + list(set(b['status'] for b in bookings))
+        status_options = ['All'] + sorted(set(f['status'] for f in facets))
         selected_status = st.selectbox("Filter by Status", status_options)
 
     with col2:
-        service_options = ['All'] + list(set(b['service_type'] for b in bookings))
+        service_options = ['All'] + sorted(set(f['service_type'] for f in facets))
         selected_service = st.selectbox("Filter by Service", service_options)
 
     with col3:
@@ -72,77 +87,123 @@ def render_booking_filters(bookings):
         date_filter = st.selectbox("Date Range",
                                  ["All Time", "Last 7 Days", "Last 30 Days", "Last 3 Months"])
 
-    filtered_bookings = apply_booking_filters(bookings, selected_status, selected_service, date_filter)
+    filters = apply_booking_filters(selected_status, selected_service, date_filter)
+
+    if st.session_state.get('booking_history_filters') != filters:
+        st.session_state.booking_history_filters = filters
+        st.session_state.booking_history_page = 1
+        st.session_state.booking_history_open = None
 
-    if filtered_bookings:
-        render_booking_list(filtered_bookings)
+    result = db.get_customer_bookings_page(
+        st.session_state.user_id,
+        page=st.session_state.get('booking_history_page', 1),
+        page_size=BOOKING_PAGE_SIZE,
+        **filters,
+    )
+
+    if result['rows']:
+        render_booking_list(result)
     else:
         st.info("No bookings match the selected filters.")
 
-def apply_booking_filters(bookings, status_filter, service_filter, date_filter):
+def apply_booking_filters(status_filter, service_filter, date_filter):
 
-    filtered = bookings.copy()
+    days = DATE_RANGES.get(date_filter)
 
-    if status_filter != 'All':
-        filtered = [b for b in filtered if b['status'] == status_filter]
+    # Day granularity keeps the filter, and so the cached count, stable across reruns.
+    return {
+        'status': None if status_filter == 'All' else status_filter,
+        'service_type': None if service_filter == 'All' else service_filter,
+        'created_from': date.today() - timedelta(days=days) if days else None,
+    }
 
-    if service_filter != 'All':
-        filtered = [b for b in filtered if b['service_type'] == service_filter]
+def render_booking_list(result):
 
-    if date_filter != 'All Time':
-        now = datetime.now()
-        if date_filter == 'Last 7 Days':
-            cutoff = now - timedelta(days=7)
-        elif date_filter == 'Last 30 Days':
-            cutoff = now - timedelta(days=30)
-        elif date_filter == 'Last 3 Months':
-            cutoff = now - timedelta(days=90)
-        else:
-            cutoff = None
+    st.session_state.booking_history_page = result['page']
 
-        if cutoff:
-            filtered = [b for b in filtered
-                       if datetime.fromisoformat(str(b['created_at']).replace('Z', '')) > cutoff]
+    for booking in result['rows']:
+        render_booking_card(booking)
 
-    return filtered
+    render_booking_pagination(result)
 
-def render_booking_list(bookings):
+def render_booking_pagination(result):
 
-    sorted_bookings = sorted(bookings,
-                           key=lambda x: datetime.fromisoformat(str(x['created_at']).replace('Z', '')),
-                           reverse=True)
+    first = (result['page'] - 1) * result['page_size'] + 1
+    last = first + len(result['rows']) - 1
+    st.caption(f"Showing {first}–{last} of {result['total']} bookings")
 
-    for booking in sorted_bookings:
-        render_booking_card(booking)
+    if result['pages'] == 1:
+        return
 
-def render_booking_card(booking):
+    col1, col2, col3 = st.columns([1, 2, 1])
 
-    status_colors = {
-        'pending': '🟡',
-        'confirmed': '🔵',
-        'in_progress': '🟢',
-        'completed': '✅',
-        'cancelled': '❌'
-    }
+    with col1:
+        st.button("⬅️ Previous", key="booking_history_prev", disabled=result['page'] <= 1,
+                  on_click=set_booking_page, args=(result['page'] - 1,))
+
+    with col2:
+        st.number_input(f"Page (of {result['pages']})", min_value=1, max_value=result['pages'],
+                        step=1, key="booking_history_page")
+
+    with col3:
+        st.button("Next ➡️", key="booking_history_next", disabled=result['page'] >= result['pages'],
+                  on_click=set_booking_page, args=(result['page'] + 1,))
 
-    status_icon = status_colors.get(booking['status'], '⚪')
+def set_booking_page(page):
 
-    with st.expander(f"{status_icon} {booking['pickup_location']} → {booking['dropoff_location']} ({booking['status'].title()})", expanded=False):
-        col1, col2 = st.columns(2)
+    st.session_state.booking_history_page = page
+    st.session_state.booking_history_open = None
+
+def toggle_booking(booking_id):
+
+    is_open = st.session_state.get('booking_history_open') == booking_id
+    st.session_state.booking_history_open = None if is_open else booking_id
+
+def render_booking_card(booking):
+
+    status_icon = STATUS_ICONS.get(booking['status'], '⚪')
+    is_open = st.session_state.get('booking_history_open') == booking['id']
+    fare = booking.get('actual_fare') or booking.get('estimated_fare', 0)
+
+    with st.container():
+        col1, col2 = st.columns([4, 1])
 
         with col1:
-            st.markdown(f)
+            st.markdown(f"{status_icon} **{booking['pickup_location']} → {booking['dropoff_location']}** "
+                        f"({booking['status'].title()}) · {booking['pickup_datetime']} · ₹{fare}")
 
         with col2:
-            actual_fare = booking.get('actual_fare') or booking.get('estimated_fare', 0)
-            driver_name = booking.get('driver_name', 'Not assigned')
+            st.button("Hide" if is_open else "Details", key=f"toggle_{booking['id']}",
+                      on_click=toggle_booking, args=(booking['id'],))
+
+        # Only the open card loads its driver details and renders actions,
+        # so a page costs one widget per booking.
+        if is_open:
+            render_booking_expanded(booking['id'])
+
+def render_booking_expanded(booking_id):
+
+    booking = db.get_booking_details(booking_id)
+
+    if not booking:
+        st.warning("This booking is no longer available.")
+        return
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown(f)
+
+    with col2:
+        actual_fare = booking.get('actual_fare') or booking.get('estimated_fare', 0)
+        driver_name = booking.get('driver_name') or 'Not assigned'
 
-            st.markdown(f)
+        st.markdown(f)
 
-        if booking.get('special_instructions'):
-            st.markdown(f"**📝 Instructions:** {booking['special_instructions']}")
+    if booking.get('special_instructions'):
+        st.markdown(f"**📝 Instructions:** {booking['special_instructions']}")
 
-        render_booking_actions(booking)
+    render_booking_actions(booking)
 
 def render_booking_actions(booking):
 
@@ -193,7 +254,7 @@ def render_booking_details(booking):
     st.subheader("📋 Booking Details")
 
     details_df = pd.DataFrame([
-        ["Booking ID", booking['id']],
+        ["Booking Reference", generate_booking_reference(booking['id'])],
         ["Status", booking['status'].title()],
         ["Pickup Location", booking['pickup_location']],
         ["Dropoff Location", booking['dropoff_location']],
@@ -202,7 +263,7 @@ def render_booking_details(booking):
         ["Vehicle Type", booking['vehicle_type'].title()],
         ["Estimated Fare", f"₹{booking.get('estimated_fare', 0)}"],
         ["Actual Fare", f"₹{booking.get('actual_fare', 'N/A')}"],
-        ["Driver", booking.get('driver_name', 'Not assigned')],
+        ["Driver", booking.get('driver_name') or 'Not assigned'],
         ["Created At", str(booking['created_at'])],
         ["Special Instructions", booking.get('special_instructions', 'None')]
     ], columns=["Field", "Value"])
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Dict, List, Optional
-from config.database import db_manager
+from config.database import db, db_manager
 
 class BookingManager:
 
@@ -26,13 +26,11 @@ class BookingManager:
     @staticmethod
     def update_booking_status(booking_id: int, status: str) -> bool:
 
-        query = "UPDATE bookings SET status = ? WHERE id = ?"
-        affected_rows = db_manager.execute_update(query, (status, booking_id))
+        affected_rows = db.update_booking_status(booking_id, status)
         return affected_rows > 0
 
     @staticmethod
     def assign_driver(booking_id: int, driver_id: int) -> bool:
 
-        query = "UPDATE bookings SET driver_id = ?, status = 'confirmed' WHERE id = ?"
-        affected_rows = db_manager.execute_update(query, (driver_id, booking_id))
+        affected_rows = db.update_booking_status(booking_id, 'confirmed', driver_id)
         return affected_rows > 0
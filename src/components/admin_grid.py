@@ -0,0 +1,107 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+
+from config.database import ADMIN_GRIDS
+from src.utils import page_cache
+
+GRID_PAGE_SIZES = [25, 50, 100]
+
+DATE_RANGES = {
+    'Any time': None,
+    'Last 7 Days': 7,
+    'Last 30 Days': 30,
+    'Last 3 Months': 90,
+}
+
+# Widgets for the filters each grid pushes down to SQL. A list of options
+# renders a selectbox, None a prefix text box and DATE_RANGES a date range.
+GRID_FILTERS = {
+    'users': [
+        ('role', "Role", ['customer', 'driver', 'admin']),
+        ('is_active', "Active", [True, False]),
+        ('username', "Username starts with", None),
+        ('email', "Email starts with", None),
+    ],
+    'drivers': [
+        ('is_available', "Available", [True, False]),
+        ('username', "Username starts with", None),
+    ],
+    'bookings': [
+        ('status', "Status", ['pending', 'confirmed', 'in_progress', 'completed', 'cancelled']),
+        ('service_type', "Service", ['airport_transfer', 'corporate', 'wedding', 'hourly', 'outstation']),
+        ('vehicle_type', "Vehicle", ['sedan', 'suv', 'hatchback', 'luxury', 'van']),
+        ('created_from', "Created", DATE_RANGES),
+    ],
+}
+
+def option_label(value):
+    if value is None:
+        return "All"
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return str(value).replace('_', ' ').title()
+
+def render_grid_filters(grid):
+
+    filters = {}
+    cols = st.columns(len(GRID_FILTERS[grid]))
+
+    for col, (name, label, options) in zip(cols, GRID_FILTERS[grid]):
+        key = f"admin_grid_{grid}_{name}"
+        with col:
+            if options is DATE_RANGES:
+                days = DATE_RANGES[st.selectbox(label, list(DATE_RANGES), key=key)]
+                filters[name] = date.today() - timedelta(days=days) if days else None
+            elif options is None:
+                filters[name] = st.text_input(label, key=key).strip() or None
+            else:
+                filters[name] = st.selectbox(label, [None] + options, format_func=option_label, key=key)
+
+    return filters
+
+def render_admin_grid(grid):
+
+    filters = render_grid_filters(grid)
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        sort = st.selectbox("Sort by", list(ADMIN_GRIDS[grid]['sorts']), format_func=option_label,
+                            key=f"admin_grid_{grid}_sort")
+
+    with col2:
+        descending = st.selectbox("Order", [True, False], key=f"admin_grid_{grid}_order",
+                                  format_func=lambda d: "Descending" if d else "Ascending")
+
+    with col3:
+        page_size = st.selectbox("Rows per page", GRID_PAGE_SIZES, index=1, key=f"admin_grid_{grid}_size")
+
+    # Changing the query starts again from the first page.
+    query = (sort, descending, page_size, tuple(sorted(filters.items())))
+    state = st.session_state.setdefault(f"admin_grid_{grid}", {'query': query, 'cursors': [None]})
+    if state['query'] != query:
+        state['query'] = query
+        state['cursors'] = [None]
+    cursors = state['cursors']
+
+    page = page_cache.get_admin_grid_page(grid, cursor=cursors[-1], page_size=page_size, sort=sort,
+                                          descending=descending, filters=filters)
+
+    if not page['rows']:
+        st.info(f"No {grid} match the selected filters")
+        return
+
+    st.dataframe(pd.DataFrame(page['rows']), use_container_width=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("Previous", disabled=len(cursors) == 1, key=f"admin_grid_{grid}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if st.button("Next", disabled=page['next_cursor'] is None, key=f"admin_grid_{grid}_next"):
+            cursors.append(page['next_cursor'])
+            st.rerun()
@@ -1,10 +1,13 @@
 from unicodedata import name
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
+from datetime import datetime
 from config.database import db
 from src.auth.auth_utils import check_authentication, logout_user
 
+MAX_REQUEST_PAGES = 10
+
+@db.request_scope("driver_dashboard")
 def render_driver_dashboard():
 
     is_auth, message = check_authentication('driver')
@@ -22,10 +25,12 @@ def render_driver_dashboard():
 
     render_driver_header(user, driver)
 
+    summary = db.get_driver_dashboard_summary(driver['id'])
+
     tab1, tab2, tab3, tab4 = st.tabs(["🏠 Overview", "🚨 Requests", "📊 History", "💰 Earnings"])
 
     with tab1:
-        render_driver_overview(driver)
+        render_driver_overview(driver, summary)
 
     with tab2:
         render_trip_requests(driver)
@@ -34,7 +39,7 @@ def render_driver_dashboard():
         render_trip_history(driver)
 
     with tab4:
-        render_earnings_summary(driver)
+        render_earnings_summary(summary)
 
 def render_driver_header(user, driver):
 
@@ -56,9 +61,7 @@ def render_driver_header(user, driver):
             logout_user()
             st.switch_page("pages/🔐_Login.py")
 
-def render_driver_overview(driver):
-
-    bookings = db.get_bookings_by_driver(driver['id'])
+def render_driver_overview(driver, summary):
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -66,27 +69,25 @@ def render_driver_overview(driver):
         st.metric("⭐ Rating", f"{driver['rating']:.1f}", help="Your average rating")
 
     with col2:
-        completed_trips = len([b for b in bookings if b['status'] == 'completed'])
-        st.metric("🎯 Total Trips", completed_trips)
+        st.metric("🎯 Total Trips", summary['completed_trips'])
 
     with col3:
-        pending_trips = len([b for b in bookings if b['status'] == 'pending'])
-        st.metric("⏳ Pending Requests", pending_trips)
+        st.metric("⏳ Pending Requests", summary['pending_trips'])
 
     with col4:
-        today_trips = len([b for b in bookings if str(b['pickup_datetime']).startswith(date.today().isoformat())])
-        st.metric("📅 Today's Trips", today_trips)
+        st.metric("📅 Today's Trips", summary['today_trips'])
 
     st.divider()
 
-    render_active_trips(driver)
+    render_active_trips(driver, summary)
 
-def render_active_trips(driver):
+def render_active_trips(driver, summary):
 
     st.subheader("🎯 Your Active Trips")
 
-    active_bookings = [b for b in db.get_bookings_by_driver(driver['id'])
-                      if b['status'] in ['confirmed', 'in_progress']]
+    active_bookings = []
+    if summary['active_trips']:
+        active_bookings = db.search_driver_bookings(driver['id'], status=['confirmed', 'in_progress'])
 
     if not active_bookings:
         st.info("📭 No active trips")
@@ -126,14 +127,18 @@ def render_trip_requests(driver):
 
     st.subheader("🚨 New Trip Requests")
 
-    all_bookings = db._read_table('bookings')
-    pending_bookings = [b for b in all_bookings if b['status'] == 'pending' and not b.get('driver_id')]
+    cursors = st.session_state.setdefault('trip_request_cursors', [None])
+    feed = db.get_trip_request_feed(driver.get('vehicle_types'), cursor=cursors[-1], page_size=3)
+    pending_bookings = feed['rows']
 
     if not pending_bookings:
         st.info("🎉 No pending requests at the moment!")
+        if len(cursors) > 1 and st.button("⏮️ Back to newest", key="trip_requests_reset"):
+            del cursors[1:]
+            st.rerun()
         return
 
-    for booking in pending_bookings[:3]:
+    for booking in pending_bookings:
         with st.container():
             col1, col2, col3 = st.columns([2, 2, 1])
 
@@ -154,6 +159,19 @@ def render_trip_requests(driver):
 
         st.divider()
 
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if len(cursors) > 1 and st.button("⏮️ Back to newest", key="trip_requests_reset"):
+            del cursors[1:]
+            st.rerun()
+
+    with col2:
+        if feed['next_cursor'] is not None and len(cursors) < MAX_REQUEST_PAGES:
+            if st.button("➡️ More requests", key="trip_requests_next"):
+                cursors.append(feed['next_cursor'])
+                st.rerun()
+
 def render_trip_history(driver):
 
     st.subheader("📊 Trip History")
@@ -190,19 +208,16 @@ def render_trip_history(driver):
 
     st.dataframe(filtered_df, use_container_width=True)
 
-def render_earnings_summary(driver):
+def render_earnings_summary(summary):
 
     st.subheader("💰 Earnings Summary")
 
-    completed_bookings = [b for b in db.get_bookings_by_driver(driver['id'])
-                         if b['status'] == 'completed']
-
-    if not completed_bookings:
+    if not summary['completed_trips']:
         st.info("Complete some trips to see earnings!")
         return
 
-    total_earnings = sum(b['estimated_fare'] for b in completed_bookings)
-    avg_fare = total_earnings / len(completed_bookings) if completed_bookings else 0
+    total_earnings = summary['total_earnings']
+    avg_fare = summary['avg_fare']
 
     col1, col2, col3 = st.columns(3)
 
@@ -213,4 +228,4 @@ def render_earnings_summary(driver):
         st.metric("📊 Average Fare", f"₹{avg_fare:.2f}")
 
     with col3:
-        st.metric("🎯 Completed Trips", len(completed_bookings))
+        st.metric("🎯 Completed Trips", summary['completed_trips'])
@@ -6,7 +6,9 @@ from config.database import db
 from src.auth.login import check_authentication, logout_user
 from src.booking.booking_form import render_booking_form
 from src.booking.booking_history import render_booking_history
+from src.utils.dataframes import BookingFrame
 
+@db.request_scope("user_dashboard")
 def render_user_dashboard():
 
     is_auth, message = check_authentication()
@@ -60,23 +62,21 @@ def render_dashboard_header(user):
 def render_user_bookings():
 
     try:
-        bookings = db.get_bookings_by_customer(st.session_state.user_id)
+        rows = db.get_bookings_by_customer(st.session_state.user_id)
 
-        if not bookings:
+        if not rows:
             st.info("📭 No bookings yet! Book your first ride in the 'Book Ride' tab.")
             return
 
+        bookings = BookingFrame.from_rows(rows)
         render_booking_quick_stats(bookings)
 
         st.subheader("📋 Recent Bookings")
-        recent_bookings = sorted(bookings,
-                               key=lambda x: datetime.fromisoformat(str(x['created_at']).replace('Z', '')),
-                               reverse=True)[:5]
+        by_id = {row['id']: row for row in rows}
+        for booking_id in bookings.recent(5)['id']:
+            render_booking_summary_card(by_id[booking_id])
 
-        for booking in recent_bookings:
-            render_booking_summary_card(booking)
-
-        if len(bookings) > 5:
+        if len(rows) > 5:
             if st.button("📊 View All Bookings"):
                 st.switch_page("pages/📊_Booking_History.py")
 
@@ -86,10 +86,9 @@ def render_user_bookings():
 def render_booking_quick_stats(bookings):
 
     total_bookings = len(bookings)
-    completed = len([b for b in bookings if b['status'] == 'completed'])
-    pending = len([b for b in bookings if b['status'] == 'pending'])
-    total_spent = sum(float(b.get('actual_fare', b.get('estimated_fare', 0)))
-                     for b in bookings if b['status'] == 'completed')
+    completed = bookings.count('completed')
+    pending = bookings.count('pending')
+    total_spent = bookings.total_fare('completed')
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -142,95 +141,78 @@ def render_user_analytics():
     st.subheader("📈 Your Travel Analytics")
 
     try:
-        bookings = db.get_bookings_by_customer(st.session_state.user_id)
+        customer_id = st.session_state.user_id
+        service_mix = db.get_customer_service_mix(customer_id)
 
-        if not bookings:
+        if not service_mix:
             st.info("📊 No data available yet. Complete some trips to see analytics!")
             return
 
-        render_monthly_spending_chart(bookings)
+        render_monthly_spending_chart(customer_id)
 
-        render_service_breakdown(bookings)
+        render_service_breakdown(service_mix)
 
-        render_travel_patterns(bookings)
+        render_travel_patterns(customer_id)
 
     except Exception as e:
         st.error(f"❌ Error loading analytics: {str(e)}")
 
-def render_monthly_spending_chart(bookings):
+def render_monthly_spending_chart(customer_id):
 
-    completed_bookings = [b for b in bookings if b['status'] == 'completed']
+    monthly = db.get_customer_monthly_spend(customer_id)
 
-    if not completed_bookings:
+    if not monthly:
         st.info("No completed trips to analyze yet.")
         return
 
-    monthly_data = {}
-    for booking in completed_bookings:
-        try:
-            month = str(booking['created_at'])[:7]
-            fare = float(booking.get('actual_fare', booking.get('estimated_fare', 0)))
-            monthly_data[month] = monthly_data.get(month, 0) + fare
-        except (ValueError, TypeError):
-            continue
+    df = pd.DataFrame(monthly).rename(columns={'month': 'Month', 'amount': 'Amount'})
+    df['Amount'] = df['Amount'].astype(float)
 
-    if monthly_data:
-        df = pd.DataFrame(list(monthly_data.items()), columns=['Month', 'Amount'])
-        df = df.sort_values('Month')
+    st.markdown("
+    st.bar_chart(df[['Month', 'Amount']].set_index('Month'))
 
-        st.markdown("
-        st.bar_chart(df.set_index('Month'))
+def render_service_breakdown(rows):
 
-def render_service_breakdown(bookings):
+    service_mix = pd.DataFrame(rows)
+    service_mix = service_mix[service_mix['trips'] > 0]
 
-    service_counts = {}
-    for booking in bookings:
-        service = booking['service_type'].replace('_', ' ').title()
-        service_counts[service] = service_counts.get(service, 0) + 1
+    if not service_mix.empty:
+        service_mix = pd.DataFrame({
+            'Count': service_mix['trips'].to_numpy(),
+            'Share': service_mix['trips'].to_numpy() / service_mix['trips'].sum() * 100,
+        }, index=service_mix['service_type'].astype(str).str.replace('_', ' ').str.title().rename('Service'))
 
-    if service_counts:
         col1, col2 = st.columns(2)
 
         with col1:
             st.markdown("
-            df = pd.DataFrame(list(service_counts.items()), columns=['Service', 'Count'])
-            st.bar_chart(df.set_index('Service'))
+            st.bar_chart(service_mix[['Count']])
 
         with col2:
             st.markdown("
-            for service, count in service_counts.items():
-                percentage = (count / len(bookings)) * 100
-                st.write(f"**{service}:** {count} trips ({percentage:.1f}%)")
+            for service, row in service_mix.iterrows():
+                st.write(f"**{service}:** {int(row['Count'])} trips ({row['Share']:.1f}%)")
 
-def render_travel_patterns(bookings):
+def render_travel_patterns(customer_id):
 
     st.markdown("
 
-    pickup_counts = {}
-    for booking in bookings:
-        pickup = booking['pickup_location']
-        pickup_counts[pickup] = pickup_counts.get(pickup, 0) + 1
-
-    dropoff_counts = {}
-    for booking in bookings:
-        dropoff = booking['dropoff_location']
-        dropoff_counts[dropoff] = dropoff_counts.get(dropoff, 0) + 1
+    pickup_counts = db.get_customer_top_locations(customer_id, 'pickup_location')
+    dropoff_counts = db.get_customer_top_locations(customer_id, 'dropoff_location')
 
     col1, col2 = st.columns(2)
 
     with col1:
         if pickup_counts:
             st.write("**Most Used Pickup Locations:**")
-            sorted_pickups = sorted(pickup_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            for location, count in sorted_pickups:
-                st.write(f"• {location}: {count} times")
+            for row in pickup_counts:
+                st.write(f"• {row['location']}: {row['trips']} times")
 
     with col2:
         if dropoff_counts:
             st.write("**Most Used Destinations:**")
-            sorted_dropoffs = sorted(dropoff_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            for location, count in sorted_dropoffs:
-                st.write(f"• {location}: {count} times")
+            for row in dropoff_counts:
+                st.write(f"• {row['location']}: {row['trips']} times")
 
 def render_user_profile(user):
 
@@ -0,0 +1,3 @@
+from config.database import db, db_manager
+
+__all__ = ['db', 'db_manager']
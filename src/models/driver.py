@@ -1,4 +1,5 @@
 from typing import Optional, List, Dict
+from config.ids import id_param
 from src.data.database import db_manager
 
 class Driver:
@@ -33,7 +34,7 @@ class Driver:
     def get_by_id(cls, driver_id: int) -> Optional['Driver']:
 
         query = "SELECT * FROM drivers WHERE id = ?"
-        result = db_manager.execute_query(query, (driver_id,))
+        result = db_manager.execute_query(query, (id_param(driver_id),))
 
         if result:
             row = result[0]
@@ -75,7 +76,7 @@ class Driver:
     def update_availability(self, is_available: bool) -> bool:
 
         query = "UPDATE drivers SET is_available = ? WHERE id = ?"
-        affected_rows = db_manager.execute_update(query, (is_available, self.id))
+        affected_rows = db_manager.execute_update(query, (is_available, id_param(self.id)))
         if affected_rows > 0:
             self.is_available = is_available
             return True
@@ -84,7 +85,7 @@ class Driver:
     def update_rating(self, new_rating: float) -> bool:
 
         query = "UPDATE drivers SET rating = ? WHERE id = ?"
-        affected_rows = db_manager.execute_update(query, (new_rating, self.id))
+        affected_rows = db_manager.execute_update(query, (new_rating, id_param(self.id)))
         if affected_rows > 0:
             self.rating = new_rating
             return True
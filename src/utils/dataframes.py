@@ -0,0 +1,61 @@
+import io
+import pandas as pd
+
+def csv_from_batches(batches) -> str:
+    buffer = io.StringIO()
+    for i, rows in enumerate(batches):
+        pd.DataFrame(rows).to_csv(buffer, header=(i == 0), index=False)
+    return buffer.getvalue()
+
+BOOKING_CATEGORIES = {
+    'status': ('pending', 'confirmed', 'in_progress', 'completed', 'cancelled'),
+    'service_type': ('airport_transfer', 'corporate', 'wedding', 'hourly', 'outstation'),
+    'vehicle_type': ('sedan', 'suv', 'hatchback', 'luxury', 'van'),
+    'pickup_location': (),
+    'dropoff_location': (),
+}
+BOOKING_TIMESTAMPS = ('pickup_datetime', 'created_at', 'updated_at')
+BOOKING_AMOUNTS = ('estimated_fare', 'actual_fare', 'rating')
+
+def _float_column(values: pd.Series) -> pd.Series:
+    try:
+        return values.astype('float64')
+    except (TypeError, ValueError):
+        return pd.to_numeric(values, errors='coerce').astype('float64')
+
+class BookingFrame:
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_rows(cls, rows) -> 'BookingFrame':
+        frame = pd.DataFrame.from_records(list(rows))
+        for column, known in BOOKING_CATEGORIES.items():
+            if column not in frame:
+                frame[column] = None
+            observed = set(frame[column].dropna().unique()) - set(known)
+            frame[column] = pd.Categorical(frame[column], categories=[*known, *sorted(observed)])
+        for column in BOOKING_TIMESTAMPS:
+            frame[column] = pd.to_datetime(frame[column] if column in frame else None, errors='coerce')
+        for column in BOOKING_AMOUNTS:
+            frame[column] = _float_column(frame[column] if column in frame else pd.Series(None, index=frame.index))
+        # Completed trips are billed at the actual fare when one was recorded.
+        frame['fare'] = frame['actual_fare'].fillna(frame['estimated_fare'])
+        return cls(frame)
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def count(self, *statuses) -> int:
+        return int(self.frame['status'].isin(statuses).sum())
+
+    def total_fare(self, *statuses) -> float:
+        frame = self.frame[self.frame['status'].isin(statuses)] if statuses else self.frame
+        return float(frame['fare'].sum())
+
+    def recent(self, n: int = 5, by: str = 'created_at') -> pd.DataFrame:
+        return self.frame.nlargest(n, by)
@@ -0,0 +1,200 @@
+import csv
+import difflib
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+PLACES_PATH = os.path.join(DATA_DIR, 'places.csv')
+
+EARTH_RADIUS_KM = 6371.0088
+ROAD_FACTOR = float(os.getenv('DISTANCE_ROAD_FACTOR', 1.3))
+DEFAULT_DISTANCE_KM = float(os.getenv('DISTANCE_DEFAULT_KM', 15))
+MIN_DISTANCE_KM = 1.0
+FUZZY_CUTOFF = 0.8
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+def normalize_place(text: str) -> str:
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+class Gazetteer:
+    def __init__(self, path: str = PLACES_PATH):
+        names, latitudes, longitudes, aliases = [], [], [], {}
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        for index, row in enumerate(csv.DictReader(content.splitlines())):
+            names.append(row['name'])
+            latitudes.append(float(row['latitude']))
+            longitudes.append(float(row['longitude']))
+            for alias in [row['name'], *row['aliases'].split('|')]:
+                aliases.setdefault(normalize_place(alias), index)
+        self.names = names
+        self.latitudes = np.array(latitudes)
+        self.longitudes = np.array(longitudes)
+        self.aliases = aliases
+        self.version = hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+        # Longest alias first, so "bandra west, mumbai" resolves to Bandra West
+        # rather than the city-wide "mumbai" entry.
+        self._by_length = sorted(aliases, key=len, reverse=True)
+        self._matrix = None
+        self.resolve = functools.lru_cache(maxsize=8192)(self._resolve)
+
+    def _resolve(self, text: str):
+        query = normalize_place(text)
+        if not query:
+            return None
+        if query in self.aliases:
+            return self.aliases[query]
+        padded = f" {query} "
+        for alias in self._by_length:
+            if f" {alias} " in padded:
+                return self.aliases[alias]
+        match = difflib.get_close_matches(query, self._by_length, n=1, cutoff=FUZZY_CUTOFF)
+        return self.aliases[match[0]] if match else None
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            lat, lon = self.latitudes, self.longitudes
+            km = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :]) * ROAD_FACTOR
+            self._matrix = np.maximum(km, MIN_DISTANCE_KM)
+        return self._matrix
+
+class PairStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=1, check_same_thread=False, isolation_level=None)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS route_distances (
+                version TEXT NOT NULL,
+                pickup TEXT NOT NULL,
+                dropoff TEXT NOT NULL,
+                km REAL NOT NULL,
+                PRIMARY KEY (version, pickup, dropoff)
+                )"""
+            )
+        return self._conn
+
+    def get(self, version: str, key):
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT km FROM route_distances WHERE version=? AND pickup=? AND dropoff=?",
+                    (version, *key)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def put(self, version: str, key, km: float):
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO route_distances (version, pickup, dropoff, km) VALUES (?, ?, ?, ?)",
+                    (version, *key, km)
+                )
+        except sqlite3.Error:
+            pass
+
+class DistanceEngine:
+    def __init__(self, gazetteer: Gazetteer = None, max_entries: int = 4096, store: PairStore = None):
+        self.gazetteer = gazetteer or Gazetteer()
+        self.max_entries = max_entries
+        self.store = store
+        self._routes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.unresolved = 0
+
+    @staticmethod
+    def route_key(pickup: str, dropoff: str):
+        key = (normalize_place(pickup), normalize_place(dropoff))
+        return key if key[0] <= key[1] else (key[1], key[0])
+
+    def distance(self, pickup: str, dropoff: str) -> float:
+        key = self.route_key(pickup, dropoff)
+        with self._lock:
+            km = self._routes.get(key)
+            if km is not None:
+                self._routes.move_to_end(key)
+                self.hits += 1
+                return km
+        km = self.store.get(self.gazetteer.version, key) if self.store else None
+        if km is not None:
+            with self._lock:
+                self.store_hits += 1
+        else:
+            origin, destination = self.gazetteer.resolve(key[0]), self.gazetteer.resolve(key[1])
+            with self._lock:
+                self.misses += 1
+            if origin is None or destination is None:
+                # Unknown places get a fixed estimate and are not persisted,
+                # so a later gazetteer entry can still resolve them.
+                with self._lock:
+                    self.unresolved += 1
+                return DEFAULT_DISTANCE_KM
+            km = round(float(self.gazetteer.matrix[origin, destination]), 2)
+            if self.store:
+                self.store.put(self.gazetteer.version, key, km)
+        with self._lock:
+            self._routes[key] = km
+            while len(self._routes) > self.max_entries:
+                self._routes.popitem(last=False)
+        return km
+
+    def distances(self, pickups, dropoffs):
+        origins = np.array([self._index(p) for p in pickups], dtype=np.int64)
+        destinations = np.array([self._index(d) for d in dropoffs], dtype=np.int64)
+        known = (origins >= 0) & (destinations >= 0)
+        km = np.full(len(origins), DEFAULT_DISTANCE_KM, dtype=np.float64)
+        km[known] = np.round(self.gazetteer.matrix[origins[known], destinations[known]], 2)
+        return km
+
+    def _index(self, text: str) -> int:
+        index = self.gazetteer.resolve(text)
+        return -1 if index is None else index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._routes),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'unresolved': self.unresolved,
+            }
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_distance_engine() -> DistanceEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                path = os.getenv('DISTANCE_CACHE_PATH', os.path.join(DATA_DIR, 'distance_cache.sqlite3'))
+                _engine = DistanceEngine(
+                    max_entries=int(os.getenv('DISTANCE_CACHE_SIZE', 4096)),
+                    store=PairStore(path) if path else None,
+                )
+    return _engine
@@ -1,3 +1,9 @@
+import functools
+import os
+from typing import NamedTuple
+
+import numpy as np
+
 BASE_FARE = {
     'sedan': 50,
     'suv': 80,
@@ -22,29 +28,133 @@ SERVICE_MULTIPLIER = {
     'outstation': 1.3
 }
 
-def calculate_fare(distance_km: float, vehicle_type: str, service_type: str, duration_hours: float = 0) -> dict:
+DEFAULT_BASE_FARE = 50
+DEFAULT_PER_KM_RATE = 12
+HOURLY_SERVICES = ('hourly',)
+
+VEHICLE_TYPES = tuple(BASE_FARE)
+SERVICE_TYPES = tuple(SERVICE_MULTIPLIER)
+
+class Rate(NamedTuple):
+    base: float
+    per_km: float
+    multiplier: float
+    per_hour: float
+
+class Quote(NamedTuple):
+    base_fare: float
+    distance_fare: float
+    service_charge: float
+    surge_charge: float
+    total_fare: float
+
+# Rules are compiled once at import. Index len(...) of each axis is the
+# fallback for unknown vehicle or service types.
+_VEHICLE_INDEX = {vehicle: i for i, vehicle in enumerate(VEHICLE_TYPES)}
+_SERVICE_INDEX = {service: i for i, service in enumerate(SERVICE_TYPES)}
+_BASE_RATES = np.array([BASE_FARE[v] for v in VEHICLE_TYPES] + [DEFAULT_BASE_FARE], dtype=np.float64)
+_PER_KM_RATES = np.array([PER_KM_RATE[v] for v in VEHICLE_TYPES] + [DEFAULT_PER_KM_RATE], dtype=np.float64)
+_MULTIPLIERS = np.array([SERVICE_MULTIPLIER[s] for s in SERVICE_TYPES] + [1.0], dtype=np.float64)
+_HOURLY = np.array([s in HOURLY_SERVICES for s in SERVICE_TYPES] + [False])
+_PER_HOUR = _BASE_RATES[:, None] * _MULTIPLIERS[None, :] * np.where(_HOURLY, 1.0, 0.0)[None, :]
+
+RATE_TABLE = {
+    (vehicle, service): Rate(
+        float(_BASE_RATES[v]), float(_PER_KM_RATES[v]), float(_MULTIPLIERS[s]), float(_PER_HOUR[v, s])
+    )
+    for v, vehicle in enumerate(VEHICLE_TYPES + (None,))
+    for s, service in enumerate(SERVICE_TYPES + (None,))
+}
 
-    vehicle_type = vehicle_type.lower()
-    service_type = service_type.lower().replace(' ', '_')
+def round_fare(values):
+    # Half-up to the paisa. quote and quote_batch both round here so a fare
+    # is the same on every page, whichever path priced it.
+    return np.floor(np.asarray(values, dtype=np.float64) * 100 + 0.5) / 100
 
-    base = BASE_FARE.get(vehicle_type, 50)
-    per_km = PER_KM_RATE.get(vehicle_type, 12)
-    multiplier = SERVICE_MULTIPLIER.get(service_type, 1.0)
+def rate_for(vehicle_type: str, service_type: str) -> Rate:
+    vehicle = vehicle_type.lower()
+    service = service_type.lower().replace(' ', '_')
+    return RATE_TABLE[(
+        vehicle if vehicle in _VEHICLE_INDEX else None,
+        service if service in _SERVICE_INDEX else None,
+    )]
 
+@functools.lru_cache(maxsize=int(os.getenv('FARE_QUOTE_CACHE_SIZE', 4096)))
+def quote(distance_km: float, vehicle_type: str, service_type: str, duration_hours: float = 0,
+          surge: float = 1.0) -> Quote:
+    base, per_km, multiplier, per_hour = rate_for(vehicle_type, service_type)
     distance_fare = distance_km * per_km
-    total = (base + distance_fare) * multiplier
+    subtotal = base + distance_fare
+    total = per_hour * duration_hours if per_hour and duration_hours > 0 else subtotal * multiplier
+    return Quote(*(float(value) for value in round_fare(
+        [base, distance_fare, subtotal * (multiplier - 1), total * (surge - 1), total * surge]
+    )))
+
+def _codes(values, index: dict, normalize):
+    values = np.asarray(values, dtype=object)
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    lookup = np.array([index.get(normalize(u), len(index)) for u in uniques], dtype=np.intp)
+    return lookup[inverse].reshape(values.shape)
+
+def quote_batch(distances, vehicle_types, service_types, durations=0, surges=1.0) -> dict:
+    distances, vehicles, services, durations, surges = np.broadcast_arrays(
+        np.asarray(distances, dtype=np.float64),
+        _codes(vehicle_types, _VEHICLE_INDEX, str.lower),
+        _codes(service_types, _SERVICE_INDEX, lambda s: s.lower().replace(' ', '_')),
+        np.asarray(durations, dtype=np.float64),
+        np.asarray(surges, dtype=np.float64),
+    )
+    base = _BASE_RATES[vehicles]
+    multiplier = _MULTIPLIERS[services]
+    per_hour = _PER_HOUR[vehicles, services]
+    distance_fare = distances * _PER_KM_RATES[vehicles]
+    subtotal = base + distance_fare
+    total = np.where((per_hour > 0) & (durations > 0), per_hour * durations, subtotal * multiplier)
+    return {
+        'base_fare': round_fare(base),
+        'distance_fare': round_fare(distance_fare),
+        'service_charge': round_fare(subtotal * (multiplier - 1)),
+        'surge_charge': round_fare(total * (surges - 1)),
+        'total_fare': round_fare(total * surges),
+    }
+
+def compare_vehicle_fares(distance_km: float, service_type: str, duration_hours: float = 0,
+                          surge: float = 1.0) -> list:
+    quotes = quote_batch(distance_km, VEHICLE_TYPES, service_type, duration_hours, surge)
+    return [
+        {'vehicle_type': vehicle, **{key: float(values[i]) for key, values in quotes.items()}}
+        for i, vehicle in enumerate(VEHICLE_TYPES)
+    ]
+
+def reprice_bookings(bookings: list, durations=0) -> dict:
+    from src.utils.distance import get_distance_engine
+
+    distances = get_distance_engine().distances(
+        [b['pickup_location'] for b in bookings],
+        [b['dropoff_location'] for b in bookings],
+    )
+    quotes = quote_batch(
+        distances,
+        [b.get('vehicle_type') or 'sedan' for b in bookings],
+        [b['service_type'] for b in bookings],
+        durations,
+    )
+    quotes['distance_km'] = distances
+    return quotes
+
+def calculate_fare(distance_km: float, vehicle_type: str, service_type: str, duration_hours: float = 0,
+                   surge: float = 1.0) -> dict:
 
-    if service_type == 'hourly' and duration_hours > 0:
-        total = base * duration_hours * multiplier
+    fare = quote(distance_km, vehicle_type, service_type, duration_hours, surge)
+    multiplier = rate_for(vehicle_type, service_type).multiplier
+    surge_text = f" × {surge:g} surge" if surge != 1 else ""
 
     return {
-        'base_fare': round(base, 2),
-        'distance_fare': round(distance_fare, 2),
-        'service_charge': round((base + distance_fare) * (multiplier - 1), 2),
-        'total_fare': round(total, 2),
-        'breakdown': f"Base: ₹{base} + Distance ({distance_km}km): ₹{distance_fare:.2f} × {multiplier} = ₹{total:.2f}"
+        **fare._asdict(),
+        'surge_multiplier': surge,
+        'breakdown': f"Base: ₹{fare.base_fare:g} + Distance ({distance_km}km): ₹{fare.distance_fare:.2f} × {multiplier}{surge_text} = ₹{fare.total_fare:.2f}"
     }
 
 def estimate_distance(pickup: str, dropoff: str) -> float:
-    import random
-    return round(random.uniform(5, 50), 2)
+    from src.utils.distance import get_distance_engine
+    return get_distance_engine().distance(pickup, dropoff)
@@ -7,7 +7,7 @@ def format_currency(amount: float) -> str:
 
 def calculate_booking_cost(duration: str, service_type: str) -> float:
 
-    from config.settings import AppConfig
+    from src.utils.fare_calculator import quote
 
     duration_hours = {
         "1-2 hours": 1.5,
@@ -16,16 +16,16 @@ def calculate_booking_cost(duration: str, service_type: str) -> float:
         "Full Day": 8
     }
 
-    rates = {
-        "Standard": AppConfig.STANDARD_RATE,
-        "Premium": AppConfig.PREMIUM_RATE,
-        "VIP": AppConfig.VIP_RATE
+    vehicles = {
+        "Standard": "sedan",
+        "Premium": "suv",
+        "VIP": "luxury"
     }
 
     hours = duration_hours.get(duration, 1)
-    rate = rates.get(service_type, AppConfig.STANDARD_RATE)
+    vehicle = vehicles.get(service_type, "sedan")
 
-    return hours * rate
+    return quote(0, vehicle, "hourly", hours).total_fare
 
 def format_datetime(dt: datetime) -> str:
 
@@ -42,11 +42,10 @@ def get_greeting() -> str:
     else:
         return "Good evening"
 
-def generate_booking_reference() -> str:
+def generate_booking_reference(booking_id: str) -> str:
 
-    from datetime import datetime
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"CK{timestamp}"
+    from config.ids import booking_reference
+    return booking_reference(booking_id)
 
 def validate_future_datetime(date_str: str, time_str: str) -> bool:
 
@@ -0,0 +1,115 @@
+import os
+import threading
+
+import streamlit as st
+
+from config.database import db
+
+PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_TTL', 300))
+SHARED_PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_SHARED_TTL', 30))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', 1000))
+
+# Every cached loader takes the generation of its scope as an argument.
+# Writes bump only the scopes they touch, so the next rerun for that
+# customer or driver misses the cache while everyone else keeps hitting it.
+# Writes that can't name a scope bump ALL_SCOPES, which is added to every
+# generation. Orphaned entries age out through the TTL and max_entries bounds.
+ALL_SCOPES = ('all',)
+
+class _Generations:
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, *scope) -> int:
+        return self._versions.get(scope, 0) + self._versions.get(ALL_SCOPES, 0)
+
+    def bump(self, *scopes):
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+@st.cache_resource
+def _generations():
+    return _Generations()
+
+def _generation(*scope) -> int:
+    return _generations().get(*scope)
+
+def _cached(ttl: float):
+    return st.cache_data(ttl=ttl, max_entries=PAGE_CACHE_MAX_ENTRIES, show_spinner=False)
+
+@_cached(PAGE_CACHE_TTL)
+def _customer_bookings(customer_id: str, generation: int):
+    return db.get_bookings_by_customer(customer_id)
+
+@_cached(PAGE_CACHE_TTL)
+def _driver_profile(user_id: str, generation: int):
+    return db.get_driver_by_user_id(user_id)
+
+@_cached(PAGE_CACHE_TTL)
+def _driver_summary(driver_id: str, generation: int):
+    return db.get_driver_dashboard_summary(driver_id)
+
+@_cached(PAGE_CACHE_TTL)
+def _driver_bookings(driver_id: str, generation: int):
+    return db.get_bookings_by_driver(driver_id)
+
+@_cached(PAGE_CACHE_TTL)
+def _driver_search(driver_id: str, generation: int, status, limit: int):
+    return db.search_driver_bookings(driver_id, status=status, limit=limit)
+
+@_cached(SHARED_PAGE_CACHE_TTL)
+def _trip_feed(generation: int, vehicle_types, cursor, page_size: int):
+    return db.get_trip_request_feed(vehicle_types, cursor=cursor, page_size=page_size)
+
+@_cached(SHARED_PAGE_CACHE_TTL)
+def _admin(method: str, generation: int, *args, **kwargs):
+    return getattr(db, method)(*args, **kwargs)
+
+def get_bookings_by_customer(customer_id: str):
+    return _customer_bookings(customer_id, _generation('customer', customer_id))
+
+def get_driver_by_user_id(user_id: str):
+    return _driver_profile(user_id, _generation('driver_user', user_id))
+
+def get_driver_dashboard_summary(driver_id: str):
+    return _driver_summary(driver_id, _generation('driver', driver_id))
+
+def get_bookings_by_driver(driver_id: str):
+    return _driver_bookings(driver_id, _generation('driver', driver_id))
+
+def search_driver_bookings(driver_id: str, status=None, limit: int = 20):
+    return _driver_search(driver_id, _generation('driver', driver_id), status, limit)
+
+def get_trip_request_feed(vehicle_types=None, cursor=None, page_size: int = 3):
+    return _trip_feed(_generation('feed'), vehicle_types, cursor, page_size)
+
+def get_booking_stats():
+    return _admin('get_booking_stats', _generation('admin'))
+
+def get_revenue_series(days: int = 30):
+    return _admin('get_revenue_series', _generation('admin'), days)
+
+def get_top_rated_drivers(limit: int = 10):
+    return _admin('get_top_rated_drivers', _generation('admin'), limit)
+
+def get_admin_grid_page(grid: str, cursor=None, page_size: int = 50, sort: str = 'created_at',
+                        descending: bool = True, filters=None):
+    return _admin('get_admin_grid_page', _generation('admin'), grid, cursor, page_size, sort, descending, filters)
+
+# Registered on the Database so every committed write bumps the affected
+# scopes, whichever module performed it.
+def _on_write(event: dict):
+    if event['tables']:
+        _generations().bump(ALL_SCOPES)
+        return
+    scopes = [('admin',)]
+    if event['feed']:
+        scopes.append(('feed',))
+    scopes.extend(('customer', customer_id) for customer_id in event['customers'])
+    scopes.extend(('driver', driver_id) for driver_id in event['drivers'])
+    scopes.extend(('driver_user', user_id) for user_id in event['driver_users'])
+    _generations().bump(*scopes)
+
+db.add_write_listener(_on_write)
@@ -0,0 +1,157 @@
+import json
+import math
+import os
+import threading
+import time
+
+SURGE_ENABLED = os.getenv('SURGE_ENABLED', '1') != '0'
+WINDOW_SECONDS = float(os.getenv('SURGE_WINDOW_MINUTES', 15)) * 60
+BUCKET_SECONDS = float(os.getenv('SURGE_BUCKET_SECONDS', 60))
+SURGE_THRESHOLD = float(os.getenv('SURGE_THRESHOLD', 1.0))
+SURGE_SENSITIVITY = float(os.getenv('SURGE_SENSITIVITY', 0.25))
+SURGE_MAX = float(os.getenv('SURGE_MAX', 2.0))
+SURGE_STEP = 0.1
+AREA_KM = float(os.getenv('SURGE_AREA_KM', 5))
+KM_PER_DEGREE = 111.32
+
+# Drivers and pickups without a known location count toward the city-wide
+# pool; unlocated drivers are treated as able to serve any area.
+ANY_AREA = '*'
+
+class SlidingWindowCounter:
+    __slots__ = ('bucket_seconds', 'counts', 'total', 'current')
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, bucket_seconds: float = BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.counts = [0] * max(1, math.ceil(window_seconds / bucket_seconds))
+        self.total = 0
+        self.current = None
+
+    def _advance(self, now: float):
+        bucket = int(now // self.bucket_seconds)
+        if self.current is None or bucket - self.current >= len(self.counts):
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+            self.current = bucket
+        elif bucket > self.current:
+            # Each slot is cleared once as the window passes over it, so
+            # updates and reads are O(1) amortized.
+            for expired in range(self.current + 1, bucket + 1):
+                slot = expired % len(self.counts)
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+            self.current = bucket
+
+    def add(self, amount: int = 1, now: float = None):
+        self._advance(time.monotonic() if now is None else now)
+        self.counts[self.current % len(self.counts)] += amount
+        self.total += amount
+
+    def value(self, now: float = None) -> int:
+        self._advance(time.monotonic() if now is None else now)
+        return self.total
+
+def service_area(location) -> str:
+    if not location:
+        return ANY_AREA
+    from src.utils.distance import get_distance_engine
+
+    gazetteer = get_distance_engine().gazetteer
+    index = gazetteer.resolve(location)
+    if index is None:
+        return ANY_AREA
+    cell = AREA_KM / KM_PER_DEGREE
+    return f"{math.floor(gazetteer.latitudes[index] / cell)}:{math.floor(gazetteer.longitudes[index] / cell)}"
+
+def driver_area(location) -> str:
+    if isinstance(location, (bytes, str)):
+        try:
+            location = json.loads(location)
+        except ValueError:
+            return service_area(location)
+    if isinstance(location, dict):
+        return service_area(location.get('area') or location.get('address'))
+    return ANY_AREA
+
+def surge_for_ratio(demand: int, supply: int) -> float:
+    ratio = demand / max(supply, 1)
+    if ratio <= SURGE_THRESHOLD:
+        return 1.0
+    # Stepped so fare quotes stay cacheable and customers see stable prices.
+    surge = 1.0 + SURGE_SENSITIVITY * (ratio - SURGE_THRESHOLD)
+    return round(min(SURGE_MAX, math.floor(surge / SURGE_STEP + 1e-9) * SURGE_STEP), 2)
+
+class SurgeTracker:
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, bucket_seconds: float = BUCKET_SECONDS):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._demand = {}
+        self._supply = {}
+        self._driver_areas = {}
+        self._lock = threading.Lock()
+
+    def record_booking(self, pickup_location: str, now: float = None):
+        area = service_area(pickup_location)
+        with self._lock:
+            counter = self._demand.get(area)
+            if counter is None:
+                counter = self._demand[area] = SlidingWindowCounter(self.window_seconds, self.bucket_seconds)
+            counter.add(1, now)
+
+    def set_driver_available(self, driver_id: str, is_available: bool, location=None):
+        area = driver_area(location) if is_available else None
+        with self._lock:
+            previous = self._driver_areas.pop(driver_id, None)
+            if previous is not None:
+                self._supply[previous] -= 1
+            if area is not None:
+                self._driver_areas[driver_id] = area
+                self._supply[area] = self._supply.get(area, 0) + 1
+
+    def demand(self, area: str, now: float = None) -> int:
+        with self._lock:
+            counter = self._demand.get(area)
+            return counter.value(now) if counter else 0
+
+    def supply(self, area: str) -> int:
+        with self._lock:
+            if area == ANY_AREA:
+                return self._supply.get(ANY_AREA, 0)
+            return self._supply.get(area, 0) + self._supply.get(ANY_AREA, 0)
+
+    def multiplier(self, pickup_location: str, now: float = None) -> float:
+        if not SURGE_ENABLED:
+            return 1.0
+        area = service_area(pickup_location)
+        return surge_for_ratio(self.demand(area, now), self.supply(area))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'areas': len(self._demand),
+                'demand': {area: counter.value() for area, counter in self._demand.items()},
+                'supply': dict(self._supply),
+                'available_drivers': len(self._driver_areas),
+            }
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_surge_tracker() -> SurgeTracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                tracker = SurgeTracker()
+                try:
+                    from config.database import db
+                    for driver in db.get_available_drivers():
+                        tracker.set_driver_available(driver['id'], True, driver.get('location'))
+                except Exception:
+                    # Supply starts empty and fills from availability events.
+                    pass
+                _tracker = tracker
+    return _tracker
+
+def surge_multiplier(pickup_location: str) -> float:
+    return get_surge_tracker().multiplier(pickup_location)
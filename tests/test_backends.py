@@ -0,0 +1,14 @@
+from config.backends import SQLiteBackend
+from config.database import Database
+
+def test_in_memory_database_outlives_pooled_connections():
+    db = Database(SQLiteBackend(':memory:'))
+    db.create_user({'username': 'memory', 'email': 'memory@example.com', 'password_hash': 'x'})
+
+    # Discard every pooled connection, as idle eviction or a broken link would.
+    for conn in [db.pool.acquire() for _ in range(db.pool.stats()['idle'])]:
+        db.pool.release(conn, discard=True)
+    assert db.pool.stats()['size'] == 0
+
+    row = db.fetch_one("SELECT COUNT(*) as total FROM users WHERE username=%s", ('memory',))
+    assert row['total'] == 1
@@ -0,0 +1,22 @@
+import itertools
+
+import numpy as np
+
+from src.utils.fare_calculator import SERVICE_TYPES, VEHICLE_TYPES, quote, quote_batch
+
+def test_quote_and_quote_batch_agree_to_the_paisa():
+    distances = np.round(np.arange(0.05, 50, 0.37), 2)
+    grid = list(itertools.product(distances, VEHICLE_TYPES + ('bike',), SERVICE_TYPES, (0, 3.5), (1.0, 1.25, 1.5)))
+    batch = quote_batch(*(list(column) for column in zip(*grid)))
+
+    for i, args in enumerate(grid):
+        scalar = quote(float(args[0]), *args[1:])
+        assert tuple(scalar) == tuple(float(batch[field][i]) for field in scalar._fields), args
+
+def test_fares_round_half_up():
+    assert quote(29.15, 'van', 'outstation').total_fare == 698.43
+    assert quote_batch([29.15], ['van'], ['outstation'])['total_fare'][0] == 698.43
+
+def test_hourly_services_price_by_duration_only_when_given():
+    assert quote(10, 'sedan', 'hourly', 4).total_fare == 200.0
+    assert quote(10, 'sedan', 'hourly').total_fare == 170.0
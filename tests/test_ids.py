@@ -0,0 +1,87 @@
+import uuid
+
+from config.backends import SQLiteBackend
+from config.database import Database
+from config.ids import booking_reference, encode_id, encode_params, id_param, new_id, reference_id_range
+
+def _in_range(booking_id, reference):
+    low, high = reference_id_range(reference)
+    return uuid.UUID(low).int <= uuid.UUID(booking_id).int <= uuid.UUID(high).int
+
+def test_ids_are_monotonic_within_a_process():
+    ids = [new_id() for _ in range(10000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert [encode_id(i) for i in ids] == sorted(encode_id(i) for i in ids)
+    assert all(uuid.UUID(i).version == 7 for i in ids)
+
+def test_reference_range_contains_id():
+    for booking_id in [new_id() for _ in range(1000)]:
+        assert _in_range(booking_id, booking_reference(booking_id))
+
+def test_reference_accepts_look_alikes_and_loose_formatting():
+    # Millisecond 1 and counter 1 give a reference full of 0s and a 1.
+    booking_id = str(uuid.UUID(int=(1 << 80) | (0x7 << 76) | (1 << 64) | (0b10 << 62)))
+    reference = booking_reference(booking_id)
+    assert {'0', '1'} <= set(reference[3:])
+
+    variants = [
+        reference.replace('0', 'O'),
+        reference.replace('1', 'I'),
+        reference.replace('1', 'L'),
+        reference.replace('1', 'l').replace('0', 'o').lower(),
+        reference.replace('-', ' '),
+        reference[3:].replace('-', ''),
+    ]
+    for variant in variants:
+        assert _in_range(booking_id, variant), variant
+
+def test_reference_rejects_malformed_input():
+    for reference in ["CK-1234", "CK-UUUU-UUUU-UUUU", ""]:
+        try:
+            reference_id_range(reference)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {reference!r}")
+
+def test_get_booking_by_reference_round_trip(tmp_path):
+    db = Database(SQLiteBackend(str(tmp_path / "ids.sqlite3")))
+    customer_id = db.create_user({'username': 'ref_user', 'email': 'ref@example.com', 'password_hash': 'x'})
+    booking_ids = [
+        db.create_booking({
+            'customer_id': customer_id,
+            'pickup_location': 'Juhu',
+            'dropoff_location': 'Bandra',
+            'pickup_datetime': '2026-01-01 10:00:00',
+            'service_type': 'corporate',
+            'vehicle_type': 'sedan',
+            'status': 'confirmed',
+            'estimated_fare': 100,
+        })
+        for _ in range(3)
+    ]
+    for booking_id in booking_ids:
+        reference = booking_reference(booking_id)
+        assert db.get_booking_by_reference(reference)['id'] == booking_id
+        assert db.get_booking_by_reference(reference.lower().replace('1', 'l'))['id'] == booking_id
+
+def test_only_marked_ids_are_encoded(tmp_path):
+    text = new_id()
+    assert encode_params((text, id_param(text), id_param(None), 'x')) == (text, encode_id(text), None, 'x')
+
+    db = Database(SQLiteBackend(str(tmp_path / "text.sqlite3")))
+    customer_id = db.create_user({'username': text, 'email': f'{text}@example.com', 'password_hash': 'x'})
+    booking_id = db.create_booking({
+        'customer_id': customer_id,
+        'pickup_location': 'Juhu',
+        'dropoff_location': 'Bandra',
+        'pickup_datetime': '2026-01-01 10:00:00',
+        'service_type': 'corporate',
+        'vehicle_type': 'sedan',
+        'estimated_fare': 100,
+        'special_instructions': text,
+    })
+    assert db.get_user_by_username(text)['id'] == customer_id
+    assert db.get_booking_details(booking_id)['special_instructions'] == text
+    page = db.get_admin_grid_page('users', filters={'username': text[:8]})
+    assert [row['id'] for row in page['rows']] == [customer_id]
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from config.pool import ConnectionPool, PoolTimeoutError
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.healthy = True
+
+    def ping(self, reconnect=False):
+        if not self.healthy:
+            raise ConnectionError("gone")
+
+    def close(self):
+        self.closed = True
+
+class FakeFactory:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+def test_borrow_times_out_when_pool_is_exhausted():
+    pool = ConnectionPool(FakeFactory(), min_size=0, max_size=1, wait_timeout=0.05)
+    held = pool.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()['timeouts'] == 1
+
+    pool.release(held)
+    assert pool.acquire() is held
+
+def test_idle_connections_are_evicted_down_to_min_size():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=1, max_size=3, idle_timeout=0.05)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    assert pool.stats()['idle'] == 3
+
+    time.sleep(0.1)
+    conn = pool.acquire()
+
+    stats = pool.stats()
+    assert stats['size'] == 1
+    assert stats['discarded'] == 2
+    assert sum(c.closed for c in factory.opened) == 2
+    assert not conn.closed
+    assert len(factory.opened) == 3
+
+def test_broken_connection_is_discarded_not_reused():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=0, max_size=2, recoverable_errors=(ValueError,))
+
+    with pytest.raises(ConnectionError):
+        with pool.connection() as conn:
+            raise ConnectionError("lost link")
+    assert conn.closed
+    assert pool.stats()['idle'] == 0
+
+    with pytest.raises(ValueError):
+        with pool.connection() as kept:
+            raise ValueError("bad query")
+    assert not kept.closed
+    assert pool.acquire() is kept
+    assert pool.stats()['discarded'] == 1
+
+def test_explicit_discard_closes_connection():
+    pool = ConnectionPool(FakeFactory(), min_size=0, max_size=1)
+    conn = pool.acquire()
+    pool.release(conn, discard=True)
+    assert conn.closed
+    assert pool.acquire() is not conn
+
+def test_failed_health_check_replaces_connection():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=0, max_size=1, ping_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.healthy = False
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()['size'] == 1
+
+def test_pool_opens_min_size_connections_on_creation():
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, min_size=2, max_size=4)
+    stats = pool.stats()
+    assert (stats['idle'], stats['size'], stats['created']) == (2, 2, 2)
+
+    conn = pool.acquire()
+    assert conn in factory.opened
+    assert len(factory.opened) == 2
+
+def test_pool_creation_survives_unreachable_database():
+    def unreachable():
+        raise ConnectionError("refused")
+
+    pool = ConnectionPool(unreachable, min_size=2, max_size=2)
+    assert pool.stats()['size'] == 0
+    with pytest.raises(ConnectionError):
+        pool.acquire()
@@ -0,0 +1,48 @@
+from config.backends import SQLiteBackend
+from config.database import Database
+from config.ids import id_param
+
+def _driver(db, name):
+    user_id = db.create_user({'username': name, 'email': f'{name}@example.com', 'password_hash': 'x',
+                              'role': 'driver'})
+    return db.create_driver({'user_id': user_id, 'license_number': name.upper(),
+                             'license_expiry': '2030-01-01'})
+
+def _booking(db, customer_id, driver_id):
+    return db.create_booking({
+        'customer_id': customer_id,
+        'driver_id': driver_id,
+        'pickup_location': 'Juhu',
+        'dropoff_location': 'Bandra',
+        'pickup_datetime': '2026-01-01 10:00:00',
+        'service_type': 'corporate',
+        'vehicle_type': 'sedan',
+        'status': 'completed',
+        'estimated_fare': 100,
+    })
+
+def _rating(db, driver_id):
+    return db.fetch_one("SELECT rating, rating_sum, rating_count FROM drivers WHERE id=%s", (id_param(driver_id),))
+
+def test_reassigning_rated_booking_refreshes_both_drivers(tmp_path):
+    db = Database(SQLiteBackend(str(tmp_path / "ratings.sqlite3")))
+    customer_id = db.create_user({'username': 'rider', 'email': 'rider@example.com', 'password_hash': 'x'})
+    old_driver, new_driver = _driver(db, 'old_driver'), _driver(db, 'new_driver')
+
+    first, second = _booking(db, customer_id, old_driver), _booking(db, customer_id, old_driver)
+    db.update_booking_rating(first, 3)
+    db.update_booking_rating(second, 2)
+    assert float(_rating(db, old_driver)['rating']) == 2.5
+
+    db.update_booking_status(first, 'confirmed', new_driver)
+    old, new = _rating(db, old_driver), _rating(db, new_driver)
+    assert (old['rating_sum'], old['rating_count'], float(old['rating'])) == (2, 1, 2.0)
+    assert (new['rating_sum'], new['rating_count'], float(new['rating'])) == (3, 1, 3.0)
+
+    db.update_booking_statuses_bulk([second], 'confirmed', new_driver)
+    old, new = _rating(db, old_driver), _rating(db, new_driver)
+    assert (old['rating_count'], float(old['rating'])) == (0, 5.0)
+    assert (new['rating_count'], float(new['rating'])) == (2, 2.5)
+
+    top = db.get_top_rated_drivers()
+    assert [(d['id'], float(d['rating'])) for d in top] == [(new_driver, 2.5)]
@@ -0,0 +1,68 @@
+import pytest
+
+from src.utils import surge
+from src.utils.surge import SlidingWindowCounter, SurgeTracker, surge_for_ratio
+
+@pytest.fixture
+def default_curve(monkeypatch):
+    monkeypatch.setattr(surge, 'SURGE_ENABLED', True)
+    monkeypatch.setattr(surge, 'SURGE_THRESHOLD', 1.0)
+    monkeypatch.setattr(surge, 'SURGE_SENSITIVITY', 0.25)
+    monkeypatch.setattr(surge, 'SURGE_MAX', 2.0)
+
+def test_window_expires_old_buckets():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    counter.add(now=0)
+    counter.add(now=5)
+    counter.add(now=15)
+    assert counter.value(now=20) == 3
+    assert counter.value(now=59) == 3
+    # Bucket 0 (t=0, t=5) leaves the window once bucket 6 starts.
+    assert counter.value(now=65) == 1
+    assert counter.value(now=75) == 0
+
+def test_gap_of_a_full_window_resets_counter():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    counter.add(3, now=0)
+    counter.add(now=1000)
+    assert counter.value(now=1000) == 1
+    assert sum(counter.counts) == 1
+
+def test_gap_shorter_than_window_keeps_recent_buckets():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    counter.add(2, now=30)
+    counter.add(now=80)
+    assert counter.value(now=80) == 3
+    assert counter.value(now=90) == 1
+
+@pytest.mark.parametrize('demand, supply, expected', [
+    (0, 0, 1.0),
+    (1, 1, 1.0),
+    (13, 10, 1.0),
+    (6, 4, 1.1),
+    (2, 1, 1.2),
+    (11, 5, 1.3),
+    (3, 0, 1.5),
+    (5, 1, 2.0),
+    (100, 1, 2.0),
+])
+def test_surge_curve_steps_and_caps(default_curve, demand, supply, expected):
+    assert surge_for_ratio(demand, supply) == expected
+
+def test_three_bookings_without_drivers_surge_to_one_and_a_half(default_curve):
+    tracker = SurgeTracker(window_seconds=60, bucket_seconds=10)
+    for _ in range(3):
+        tracker.record_booking(None, now=0)
+    assert tracker.multiplier(None, now=1) == 1.5
+
+    tracker.set_driver_available('driver-1', True)
+    tracker.set_driver_available('driver-2', True)
+    assert tracker.multiplier(None, now=1) == 1.1
+    assert tracker.multiplier(None, now=70) == 1.0
+
+def test_surge_disabled(default_curve, monkeypatch):
+    monkeypatch.setattr(surge, 'SURGE_ENABLED', False)
+    tracker = SurgeTracker(window_seconds=60, bucket_seconds=10)
+    for _ in range(10):
+        tracker.record_booking(None, now=0)
+    assert tracker.multiplier(None, now=1) == 1.0